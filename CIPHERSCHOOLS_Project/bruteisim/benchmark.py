@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Benchmark Runner for Brute Force Testing
+Measures attempts/sec, latency percentiles and peak memory of the attack engine
+against the local mock server, across profiles, thread counts and engines
+(threads, async, and http2 when httpx[http2] is installed)
+"""
+
+import argparse
+import contextlib
+import json
+import multiprocessing
+import os
+import queue
+import sys
+import time
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from mock_server import load_profiles, start_mock_server, DEFAULT_PASSWORD
+
+# How often to check that a case process is still alive while waiting for its row
+POLL_INTERVAL = 1.0
+
+def serve_profile(profile, options, ready):
+    """Child process: run a mock server until terminated"""
+    server, base_url = start_mock_server(profile, **options)
+    ready.put(base_url)
+    while True:
+        time.sleep(3600)
+
+def peak_rss_kb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, Linux reports kilobytes
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+def run_case(case, results):
+    """Child process: one attack against the mock server, fresh interpreter state per case"""
+    import bruteisim
+    from metrics import RunStats
+
+    profile = case['profile']
+    passwords = (f"bench-{i}" for i in range(case['attempts']))
+    stats = RunStats()
+    # Keep the attack's per-attempt output (its real cost) but out of the report
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        engine = bruteisim.BruteEngine(
+            case['url'], profile['username'], profile['username_field'], profile['password_field'],
+            profile.get('success_indicator'), profile.get('failure_indicator'), None, None,
+            threads=case['threads'], timeout=10, progress_interval=case['attempts'] + 1,
+            engine=case['engine'], body_format=profile.get('body_format', 'form'), stats=stats
+        )
+        engine.run(passwords, case['attempts'])
+    snapshot = stats.snapshot()
+    results.put({
+        'profile': case['name'],
+        'engine': case['engine'],
+        'protocol': engine.protocol,
+        'threads': case['threads'],
+        'attempts': snapshot['attempts'],
+        'errors': sum(snapshot['errors'].values()),
+        'elapsed': snapshot['elapsed'],
+        'attempts_per_sec': snapshot['attempts_per_sec'],
+        'p50_ms': round(snapshot['latency_p50'] * 1000, 2) if snapshot['latency_p50'] is not None else None,
+        'p99_ms': round(snapshot['latency_p99'] * 1000, 2) if snapshot['latency_p99'] is not None else None,
+        'peak_rss_kb': peak_rss_kb(),
+    })
+
+def collect_case(worker, results, timeout):
+    """Wait for a case process's row; returns (row, None) or (None, why it failed)"""
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            return results.get(timeout=POLL_INTERVAL), None
+        except queue.Empty:
+            pass
+        if not worker.is_alive():
+            # The row may still be in flight from a worker that has just exited
+            try:
+                return results.get(timeout=POLL_INTERVAL), None
+            except queue.Empty:
+                return None, f"case process exited with code {worker.exitcode}"
+        if time.monotonic() > deadline:
+            worker.terminate()
+            return None, f"timed out after {timeout:g}s"
+
+def format_row(row):
+    def fmt(value, spec):
+        return format(value, spec) if value is not None else '-'
+    return (f"{row['profile']:<16} {row['engine']:<8} {fmt(row['protocol'], '<8')} {row['threads']:>7} {row['attempts']:>8} {row['errors']:>6} "
+            f"{fmt(row['attempts_per_sec'], '>10.1f')} {fmt(row['p50_ms'], '>8.2f')} {fmt(row['p99_ms'], '>8.2f')} "
+            f"{fmt(row['peak_rss_kb'], '>10')}")
+
+def main():
+    profiles = load_profiles()
+    parser = argparse.ArgumentParser(description="Benchmark brute_force_login against local mock targets")
+    parser.add_argument('--profiles', nargs='+', choices=sorted(profiles), default=sorted(profiles), help='Profiles to benchmark (default: all)')
+    parser.add_argument('--threads', nargs='+', type=int, default=[1, 4, 16], help='Thread counts to try (default: 1 4 16)')
+    parser.add_argument('--engines', nargs='+', choices=['threads', 'async', 'http2'], default=['threads', 'async'], help='Engines to try (default: threads async)')
+    parser.add_argument('--attempts', type=int, default=500, help='Wrong passwords to try per case (default: 500)')
+    parser.add_argument('--latency', type=float, default=0.005, help='Mock server latency per login in seconds (default: 0.005)')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Mock server random extra latency in seconds')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of logins the mock server fails')
+    parser.add_argument('--page-kb', type=float, default=4, help='Mock page size in KB (default: 4)')
+    parser.add_argument('--case-timeout', type=float, default=600, help='Seconds before a case is abandoned (default: 600)')
+    parser.add_argument('--json', help='Also write the results to this JSON file', default=None)
+    args = parser.parse_args()
+
+    ctx = multiprocessing.get_context('spawn')
+    options = {'latency': args.latency, 'jitter': args.jitter, 'error_rate': args.error_rate,
+               'page_kb': args.page_kb, 'password': DEFAULT_PASSWORD, 'http2': 'http2' in args.engines}
+    header = (f"{'profile':<16} {'engine':<8} {'protocol':<8} {'threads':>7} {'attempts':>8} {'errors':>6} "
+              f"{'att/s':>10} {'p50 ms':>8} {'p99 ms':>8} {'peak KB':>10}")
+    print("[+] Brute force benchmark against local mock targets")
+    print(header)
+    print("-" * len(header))
+
+    rows = []
+    failed = []
+    for name in args.profiles:
+        profile = profiles[name]
+        ready = ctx.Queue()
+        server = ctx.Process(target=serve_profile, args=(profile, options, ready), daemon=True)
+        server.start()
+        try:
+            url = ready.get(timeout=10) + profile['path']
+            for engine in args.engines:
+                for threads in args.threads:
+                    case = {'name': name, 'profile': profile, 'url': url, 'engine': engine,
+                            'threads': threads, 'attempts': args.attempts}
+                    results = ctx.Queue()
+                    worker = ctx.Process(target=run_case, args=(case, results))
+                    worker.start()
+                    row, error = collect_case(worker, results, args.case_timeout)
+                    worker.join()
+                    if row is None:
+                        failed.append({'profile': name, 'engine': engine, 'threads': threads, 'error': error})
+                        print(f"{name:<16} {engine:<8} {'-':<8} {threads:>7} failed: {error}")
+                        continue
+                    rows.append(row)
+                    print(format_row(row))
+        finally:
+            server.terminate()
+            server.join()
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(rows, f, indent=2)
+        print(f"\n[+] Saved {len(rows)} results to {args.json}")
+    if failed:
+        print(f"\n[!] {len(failed)} case(s) failed: " +
+              ", ".join(f"{f['profile']}/{f['engine']}/{f['threads']}" for f in failed))
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""
+Login Body Templates for Brute Force Testing
+Encodes the constant part of the login body (the username field, and the
+password field's name) and its headers once per run, so each attempt only
+escapes the password and splices it in. Bodies are sent as a URL-encoded form
+or as a JSON object, for REST logins such as OWASP Juice Shop's.
+"""
+
+import json
+from urllib.parse import quote_plus, urlencode
+
+BODY_FORMATS = ('form', 'json')
+CONTENT_TYPES = {'form': 'application/x-www-form-urlencoded', 'json': 'application/json'}
+
+class BodyTemplate:
+    """The login body of one run, pre-encoded around the password.
+
+    encode(password) gives the same bytes as sending
+    {username_field: username, password_field: password} through requests
+    (form) or json.dumps (json); headers holds the matching Content-Type.
+    """
+    def __init__(self, username_field, password_field, username, body_format='form'):
+        if body_format not in BODY_FORMATS:
+            raise ValueError(f"body_format must be one of {', '.join(BODY_FORMATS)}, not {body_format!r}")
+        self.body_format = body_format
+        self.headers = {'Content-Type': CONTENT_TYPES[body_format]}
+        if body_format == 'json':
+            self._escape = json.dumps
+            self._prefix = f'{{{json.dumps(username_field)}:{json.dumps(username)},{json.dumps(password_field)}:'.encode()
+            self._suffix = b'}'
+        else:
+            self._escape = quote_plus
+            # Like requests, leave out a field whose value is None
+            fields = urlencode({username_field: username}) + '&' if username is not None else ''
+            self._prefix = f"{fields}{quote_plus(password_field)}=".encode()
+            self._suffix = b''
+
+    def encode(self, password):
+        """The request body for one password"""
+        return self._prefix + self._escape(password).encode() + self._suffix
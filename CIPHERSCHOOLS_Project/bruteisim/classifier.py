@@ -0,0 +1,313 @@
+"""
+Response Classifier for Brute Force Testing
+Compiles the success/failure/CAPTCHA rules of a run once, then classifies
+each response by lowercasing (at most the first N KB of) its body once and
+looking for each keyword in it.
+When redirects are not followed, the status code, Location and Set-Cookie of
+the first response can decide the verdict before any body is looked at.
+"""
+
+import bisect
+import re
+import hashlib
+import threading
+from collections import OrderedDict
+from enum import Enum
+from time import perf_counter
+
+CAPTCHA_KEYWORDS = ["captcha", "recaptcha", "i am not a robot", "please verify"]
+
+# Numbers (counters, timestamps) and long token-like runs (CSRF tokens, session
+# ids) change between otherwise identical pages, so they are masked before
+# hashing. A long run is only a token if it has a digit or mixes upper and lower
+# case like random base64; hyphenated class names, ids and paths are kept.
+# Fingerprints include the body length, so a digit is masked as b'0' in place.
+TOKEN_CHARS = b'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/_=-'
+# Token characters -> b'a', everything else -> b' ', so runs are found with bytes.find
+RUN_TABLE = bytes(0x61 if b in TOKEN_CHARS else 0x20 for b in range(256))
+LONG_RUN = b'a' * 20
+DIGIT_TABLE = bytes(0x30 if 0x30 <= b <= 0x39 else b for b in range(256))
+DIGITS = re.compile(rb'\d+')
+# bytes.translate deletion sets: what is left is a run's digits / uppercase / lowercase letters
+NOT_DIGIT = bytes(b for b in range(256) if not 0x30 <= b <= 0x39)
+NOT_UPPER = bytes(b for b in range(256) if not 0x41 <= b <= 0x5a)
+NOT_LOWER = bytes(b for b in range(256) if not 0x61 <= b <= 0x7a)
+# Share of the letters each case must make up for a digit-free run to count as random
+MIXED_CASE = 0.3
+# Bytes on either side of a masked span searched for a success/failure regex match
+REGEX_CONTEXT = 256
+# Masked pages to time before deciding whether masking pays for itself
+MASK_SAMPLES = 16
+
+class Verdict(Enum):
+    SUCCESS = 'success'
+    FAILURE = 'failure'   # failure indicator or regex matched
+    UNKNOWN = 'unknown'   # nothing matched; still counted as a failed attempt
+    CAPTCHA = 'captcha'
+
+def is_token(run):
+    """True if a run of 20+ token characters changes between pages (has a digit or looks random)"""
+    if run.translate(None, NOT_DIGIT):
+        return True
+    upper, lower = len(run.translate(None, NOT_UPPER)), len(run.translate(None, NOT_LOWER))
+    letters = upper + lower
+    return letters > 0 and min(upper, lower) >= MIXED_CASE * letters
+
+def mask(data, digit_spans=True):
+    """data with its dynamic tokens masked, and the (start, end) spans that were masked.
+
+    Long runs and digits are found in C (bytes.translate and find); with
+    digit_spans, the numbers outside long runs are listed in spans too, which
+    costs a regex match per number.
+    """
+    runs = data.translate(RUN_TABLE)
+    spans = []
+    parts = []
+    last = 0
+    start = runs.find(LONG_RUN)
+    while start != -1:
+        end = runs.find(b' ', start)
+        if end == -1:
+            end = len(data)
+        if is_token(data[start:end]):
+            spans.append((start, end))
+            parts.append(data[last:start])
+            parts.append(b'#')
+            last = end
+        start = runs.find(LONG_RUN, end)
+    if digit_spans:
+        # Numbers inside a masked run overlap its span, which does no harm
+        spans += [match.span() for match in DIGITS.finditer(data)]
+        spans.sort()
+    if parts:
+        parts.append(data[last:])
+        data = b''.join(parts)
+    return data.translate(DIGIT_TABLE), spans
+
+def status_codes(value):
+    """Status codes from a config value: one code, a list, or a comma-separated string"""
+    if value is None or value == '':
+        return frozenset()
+    if isinstance(value, str):
+        value = value.split(',')
+    elif isinstance(value, int):
+        value = [value]
+    return frozenset(int(code) for code in value)
+
+class ResponseClassifier:
+    def __init__(self, success_indicator=None, failure_indicator=None, success_regex=None, failure_regex=None, max_body_kb=None,
+                 max_fingerprints=8, follow_redirects=True, success_status=None, failure_status=None,
+                 success_location=None, failure_location=None, success_cookie=None):
+        # keyword (lowercase) -> verdicts it signals
+        keywords = {}
+        for word in CAPTCHA_KEYWORDS:
+            keywords.setdefault(word.lower(), set()).add(Verdict.CAPTCHA)
+        if success_indicator:
+            keywords.setdefault(success_indicator.lower(), set()).add(Verdict.SUCCESS)
+        if failure_indicator:
+            keywords.setdefault(failure_indicator.lower(), set()).add(Verdict.FAILURE)
+
+        # (keyword, verdicts) pairs, CAPTCHA keywords first since they decide the verdict alone
+        self._keywords = sorted(((k, frozenset(v)) for k, v in keywords.items()),
+                                key=lambda pair: Verdict.CAPTCHA not in pair[1])
+        # The same keywords as bytes, to tell whether masking hid part of a match
+        self._byte_keywords = [k.encode() for k in keywords]
+        self._longest_keyword = max(len(k) for k in self._byte_keywords)
+        self._success_regex = re.compile(success_regex) if success_regex else None
+        self._failure_regex = re.compile(failure_regex) if failure_regex else None
+        self.max_body_bytes = int(max_body_kb * 1024) if max_body_kb else None
+        self.has_failure_rule = bool(failure_indicator or failure_regex)
+        # Rules for the first response when redirects are not followed
+        self.follow_redirects = follow_redirects
+        self.success_status = status_codes(success_status)
+        self.failure_status = status_codes(failure_status)
+        self._success_location = re.compile(success_location) if success_location else None
+        self._failure_location = re.compile(failure_location) if failure_location else None
+        self.success_cookie = success_cookie
+        # Only a number inside a keyword or anything near a regex match needs the span of every number checked
+        self._digit_spans = bool(self._success_regex or self._failure_regex
+                                 or any(k.translate(None, NOT_DIGIT) for k in self._byte_keywords))
+        # Shape (status, masked redirect chain, body length) -> {masked body digest: verdict}
+        # of known non-success pages, least recently used shape first
+        self._known = OrderedDict()
+        self._known_lock = threading.Lock()
+        self._max_fingerprints = max_fingerprints
+        # Running cost of masking a page and of scanning one, and how often masking found a known page
+        self._mask_cost = 0.0
+        self._scan_cost = 0.0
+        self._masked = 0
+        self._hits = 0
+        self.fingerprinting = True
+        # Set once the baseline failure pages are recorded; pages first seen after
+        # that are counted in changed_pages
+        self.calibrated = False
+        self.changed_pages = 0
+
+    def scan(self, text):
+        """Return the set of verdicts whose keywords occur in text, ignoring case"""
+        # One lower() and a substring search per keyword beat a case-insensitive regex alternation several times over
+        lowered = text.lower()
+        found = set()
+        for keyword, verdicts in self._keywords:
+            if keyword in lowered:
+                found |= verdicts
+                if Verdict.CAPTCHA in found:
+                    break
+        return found
+
+    def classify_text(self, text, redirected=False):
+        started = perf_counter()
+        verdict = self._classify_text(text, redirected)
+        self._scan_cost += (perf_counter() - started - self._scan_cost) * 0.1
+        return verdict
+
+    def _classify_text(self, text, redirected):
+        found = self.scan(text)
+        if Verdict.CAPTCHA in found:
+            return Verdict.CAPTCHA
+        # Redirects are common on successful login (unless the redirect rules already looked at them)
+        if (redirected and self.follow_redirects) or Verdict.SUCCESS in found:
+            return Verdict.SUCCESS
+        if self._success_regex and self._success_regex.search(text):
+            return Verdict.SUCCESS
+        if Verdict.FAILURE in found:
+            return Verdict.FAILURE
+        if self._failure_regex and self._failure_regex.search(text):
+            return Verdict.FAILURE
+        return Verdict.UNKNOWN
+
+    def classify_head(self, status_code, location=None, cookies=()):
+        """Verdict from the status code, Location header and names of the cookies set, or None if they do not decide it.
+
+        Only used when redirects are not followed; failure rules are checked first.
+        """
+        if self.follow_redirects:
+            return None
+        if status_code in self.failure_status:
+            return Verdict.FAILURE
+        if location and self._failure_location and self._failure_location.search(location):
+            return Verdict.FAILURE
+        if status_code in self.success_status:
+            return Verdict.SUCCESS
+        if location and self._success_location and self._success_location.search(location):
+            return Verdict.SUCCESS
+        if self.success_cookie and self.success_cookie in cookies:
+            return Verdict.SUCCESS
+        return None
+
+    def classify(self, response, text=None):
+        """Classify a requests-style response; pass text if the body was read separately"""
+        if text is None:
+            text = response.text
+        return self.classify_text(text, redirected=bool(response.history))
+
+    def masks_rule_match(self, body, spans):
+        """True if a keyword or success/failure regex match overlaps one of the masked spans of body"""
+        if not spans:
+            return False
+        # Every match overlapping a span lies within a keyword's length of it; windows closer than that are merged
+        margin = self._longest_keyword - 1
+        windows = []
+        for start, end in spans:
+            if windows and start - margin <= windows[-1][1]:
+                windows[-1][1] = max(windows[-1][1], end + margin)
+            else:
+                windows.append([max(0, start - margin), end + margin])
+        # Search every window at once, NUL-separated, and only map the (rare) hits back to their window
+        offsets = []
+        pieces = []
+        at = 0
+        for low, high in windows:
+            offsets.append(at)
+            piece = body[low:high]
+            pieces.append(piece)
+            at += len(piece) + 1
+        joined = b'\0'.join(pieces).lower()
+        for keyword in self._byte_keywords:
+            hit = joined.find(keyword)
+            while hit != -1:
+                window = bisect.bisect_right(offsets, hit) - 1
+                begin = windows[window][0] + hit - offsets[window]
+                if any(begin < end and start < begin + len(keyword) for start, end in spans):
+                    return True
+                hit = joined.find(keyword, hit + 1)
+        # A regex match has no length bound, so any match near a masked span counts
+        regexes = [r for r in (self._success_regex, self._failure_regex) if r]
+        for regex in regexes:
+            for start, end in spans:
+                window = body[max(0, start - REGEX_CONTEXT):end + REGEX_CONTEXT]
+                if regex.search(window.decode('utf-8', errors='replace')):
+                    return True
+        return False
+
+    def fingerprint(self, status_code, redirects, body):
+        """Fingerprint a response as (shape, digest of its masked body bytes).
+
+        redirects is a sequence of (status_code, Location) pairs, one per hop.
+        The body is only masked and hashed when a known page has the same shape
+        (status, redirect chain and length); otherwise digest is None, which no
+        cached page matches. Returns None when masking hid (part of) a match of
+        the rules, since two such pages could differ only inside the mask yet
+        classify differently, and once masking has proved to cost more than the
+        scans it saves.
+        """
+        if not self.fingerprinting:
+            return None
+        chain = tuple((status, mask((location or '').encode())[0]) for status, location in redirects)
+        shape = (status_code, chain, len(body))
+        with self._known_lock:
+            if shape not in self._known:
+                return shape, None
+        started = perf_counter()
+        masked, spans = mask(body, self._digit_spans)
+        fingerprint = None
+        if not self.masks_rule_match(body, spans):
+            fingerprint = shape, hashlib.blake2b(masked, digest_size=16).digest()
+        self._mask_cost += (perf_counter() - started - self._mask_cost) * 0.1
+        self._masked += 1
+        self._check_mask_cost()
+        return fingerprint
+
+    def known_verdict(self, fingerprint):
+        """Return the cached verdict for a previously seen failure page, or None"""
+        if fingerprint is None or fingerprint[1] is None:
+            return None
+        shape, digest = fingerprint
+        with self._known_lock:
+            verdict = self._known.get(shape, {}).get(digest)
+            if verdict is not None:
+                self._known.move_to_end(shape)
+                self._hits += 1
+            return verdict
+
+    def remember(self, fingerprint, verdict):
+        """Cache a fully analysed failure page so identical responses skip the text scan.
+
+        Returns True if this is a failure page that differs from the baseline.
+        """
+        if fingerprint is None or verdict not in (Verdict.FAILURE, Verdict.UNKNOWN):
+            return False
+        shape, digest = fingerprint
+        with self._known_lock:
+            digests = self._known.get(shape)
+            # A shape seen once is stored without a digest, so its second sighting is the same page, not a new one
+            new = digests is None or (digest is not None and bool(digests) and digest not in digests)
+            if digests is None:
+                digests = self._known[shape] = {}
+            if digest is not None:
+                digests[digest] = verdict
+                while len(digests) > self._max_fingerprints:
+                    del digests[next(iter(digests))]
+            self._known.move_to_end(shape)
+            while len(self._known) > self._max_fingerprints:
+                self._known.popitem(last=False)
+            if new and self.calibrated:
+                self.changed_pages += 1
+                return True
+            return False
+
+    def _check_mask_cost(self):
+        # Masking pays when the scans skipped on hits outweigh masking every page of a known shape
+        if self._masked >= MASK_SAMPLES and self._scan_cost:
+            if self._mask_cost * self._masked > self._scan_cost * self._hits:
+                self.fingerprinting = False
@@ -0,0 +1,107 @@
+"""
+Console Output for Brute Force Testing
+Renders one live status line a few times per second instead of a line per
+attempt, so output cost does not grow with the attempt rate. Important events
+(success, CAPTCHA, errors) are always printed immediately.
+"""
+
+import sys
+import threading
+from colorama import Fore, Style
+
+class Console:
+    def __init__(self, verbose=False, refresh=0.25, stream=None):
+        self.verbose = verbose
+        self.refresh = refresh
+        self.stream = stream
+        self._lock = threading.Lock()
+        self._stats = None
+        self._progress_interval = 10
+        self._printed_progress = 0
+        self._status_shown = False
+        self._stopped = threading.Event()
+        self._thread = None
+
+    @property
+    def out(self):
+        # Resolved on every write so redirect_stdout() and colorama wrapping apply
+        return self.stream or sys.stdout
+
+    def _live(self):
+        isatty = getattr(self.out, 'isatty', None)
+        return bool(isatty and isatty())
+
+    def _clear_status(self):
+        if self._status_shown:
+            self.out.write('\r\033[K')
+            self._status_shown = False
+
+    def event(self, text):
+        """Print a line right away (success, CAPTCHA, errors, warnings)"""
+        with self._lock:
+            self._clear_status()
+            self.out.write(text + Style.RESET_ALL + '\n')
+            self.out.flush()
+
+    def attempt(self, text):
+        """Print a per-attempt line, only in verbose mode"""
+        if self.verbose:
+            self.event(text)
+
+    def start(self, stats, progress_interval=10):
+        """Begin rendering the status line for stats (a metrics.RunStats)"""
+        self.stop()
+        self._stats = stats
+        self._progress_interval = max(1, progress_interval)
+        self._printed_progress = 0
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._render_loop, name='console', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop rendering and leave a final status line behind"""
+        if self._thread is None:
+            return
+        self._stopped.set()
+        self._thread.join()
+        self._thread = None
+        self._render(final=True)
+
+    def status_text(self):
+        snap = self._stats.snapshot()
+        total = snap['total']
+        tried = snap['attempts']
+        parts = [f"[PROGRESS] {tried}/{total} passwords tried" if total else f"[PROGRESS] {tried} passwords tried"]
+        if total:
+            parts[0] += f" ({tried / total:.1%})"
+        parts.append(f"{snap['current_attempts_per_sec']:.1f} att/s (avg {snap['attempts_per_sec']:.1f})")
+        if snap['latency_p50'] is not None:
+            parts.append(f"p50 {snap['latency_p50'] * 1000:.0f}ms p99 {snap['latency_p99'] * 1000:.0f}ms")
+        if snap['concurrency'] is not None:
+            parts.append(f"in flight {snap['concurrency']}")
+        errors = sum(snap['errors'].values())
+        if errors:
+            parts.append(f"errors {errors}")
+        if snap['retries']:
+            parts.append(f"retries {snap['retries']}")
+        return ' | '.join(parts)
+
+    def _render(self, final=False):
+        if self._stats is None:
+            return
+        with self._lock:
+            if self._live():
+                self.out.write('\r\033[K' + Fore.CYAN + self.status_text() + Style.RESET_ALL + ('\n' if final else ''))
+                self._status_shown = not final
+            else:
+                # Not a terminal: one plain line per progress_interval attempts, at most once per refresh
+                tried = self._stats.attempts
+                due = tried // self._progress_interval > self._printed_progress // self._progress_interval
+                if due or (final and tried != self._printed_progress):
+                    self._printed_progress = tried
+                    self.out.write(Fore.CYAN + self.status_text() + Style.RESET_ALL + '\n')
+            self.out.flush()
+
+    def _render_loop(self):
+        while not self._stopped.wait(self.refresh):
+            self._render()
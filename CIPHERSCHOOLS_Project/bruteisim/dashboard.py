@@ -0,0 +1,313 @@
+"""
+Live Dashboard for Brute Force Testing
+A local-only HTTP server that serves webui/, lists the entries of the target
+config files, starts and stops runs against them, and streams each run's stats
+(attempts/sec, latency percentiles, verdicts, error rate, concurrency) to the
+page over Server-Sent Events.
+"""
+
+import json
+import mimetypes
+import os
+import threading
+import time
+from collections import deque
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from pathlib import Path
+
+from bruteisim import BruteEngine
+from console import Console
+from metrics import RunStats
+from run_bruteforce import load_target_configs, load_wordlist, target_result
+
+WEBUI_DIR = Path(__file__).resolve().parent.parent / 'webui'
+DEFAULT_PORT = 8800
+# Seconds between samples pushed to the page
+SAMPLE_INTERVAL = 1.0
+# Samples kept per run, so a page opened mid-run can draw the whole chart
+HISTORY_POINTS = 600
+
+class DashboardRun:
+    """One run started from the dashboard, and the samples taken of it"""
+    def __init__(self, name, engine, stats):
+        self.name = name
+        self.engine = engine
+        self.stats = stats
+        self.state = 'running'
+        self.result = None
+        self.started = time.time()
+        self.history = deque(maxlen=HISTORY_POINTS)
+        self.thread = None
+        self._last_requests = 0
+        self._last_errors = 0
+
+    def sample(self):
+        """Append a point to the history and return it"""
+        snap = self.stats.snapshot()
+        errors = sum(snap['errors'].values())
+        requests = sum(snap['verdicts'].values()) + errors
+        # Share of the requests completed since the previous sample that failed
+        done = requests - self._last_requests
+        failed = errors - self._last_errors
+        self._last_requests, self._last_errors = requests, errors
+        point = {
+            't': snap['elapsed'],
+            'rate': snap['current_attempts_per_sec'],
+            'p50': snap['latency_p50'],
+            'p90': snap['latency_p90'],
+            'p99': snap['latency_p99'],
+            'error_rate': round(failed / done, 4) if done else 0.0,
+            'concurrency': snap['concurrency'] if snap['concurrency'] is not None else self.engine.threads,
+        }
+        self.history.append(point)
+        return point
+
+    def view(self, history=False):
+        snap = self.stats.snapshot()
+        snap.pop('latency_histogram', None)
+        view = {'name': self.name, 'state': self.state, 'result': self.result, 'started': self.started,
+                'stats': snap, 'point': self.history[-1] if self.history else None}
+        if history:
+            view['history'] = list(self.history)
+        return view
+
+class Dashboard:
+    """Serves the web UI at http://127.0.0.1:<port>/ and runs the attacks it asks for.
+
+    Only binds to the loopback interface. Runs use the same target configs as
+    run_bruteforce.py (targets_files, default targets_config.yaml +
+    auto_detected_configs.yaml), with their output discarded; the page is the
+    only view of them. overrides (e.g. a ledger given on the command line) are
+    applied on top of every target's config.
+    """
+    def __init__(self, port=DEFAULT_PORT, targets_files=None, wordlist=None, limit=None, host='127.0.0.1',
+                 overrides=None):
+        self.port = port
+        self.host = host
+        self.targets_files = targets_files
+        self.overrides = overrides or {}
+        self.wordlist = wordlist
+        self.limit = limit
+        self.runs = {}
+        self._lock = threading.Lock()
+        self._changed = threading.Condition()
+        self._seq = 0
+        self._stopped = threading.Event()
+        self._server = None
+        self._devnull = None
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}/"
+
+    def targets(self):
+        return [dict(config, name=name) for name, config in load_target_configs(self.targets_files).items()]
+
+    def start_run(self, name, wordlist=None, limit=None):
+        """Start a run against a named target; raises KeyError/ValueError on a bad request"""
+        configs = load_target_configs(self.targets_files)
+        if name not in configs:
+            raise KeyError(name)
+        config = dict(configs[name], **self.overrides)
+        limit = limit if limit is not None else self.limit
+        with self._lock:
+            current = self.runs.get(name)
+            if current and current.state == 'running':
+                raise ValueError(f"{name} is already running")
+            passwords, total = load_wordlist(wordlist or self.wordlist or config.get('wordlist', 'passwords.txt'), limit)
+            stats = RunStats()
+            # Dashboard runs stay in this process so their stats can be sampled directly
+            engine = BruteEngine.from_config(config, limit=limit, processes=1, stats=stats,
+                                             console=Console(stream=self._devnull))
+            run = DashboardRun(name, engine, stats)
+            run.thread = threading.Thread(target=self._run, args=(run, passwords, total), name=f'dashboard-{name}',
+                                          daemon=True)
+            self.runs[name] = run
+        run.thread.start()
+        self._notify()
+        return run
+
+    def _run(self, run, passwords, total):
+        try:
+            found = run.engine.run(passwords, total)
+            run.result = target_result(run.engine, found)
+            run.state = 'cancelled' if run.result == 'cancelled' else 'finished'
+        except Exception as e:
+            run.result = f"error: {e}"
+            run.state = 'error'
+        run.sample()
+        self._notify()
+
+    def stop_run(self, name):
+        """Cancel a running target; False if it was not running"""
+        run = self.runs.get(name)
+        if not run or run.state != 'running':
+            return False
+        run.engine.cancel()
+        return True
+
+    def state(self, history=False):
+        return {'runs': [run.view(history) for run in list(self.runs.values())]}
+
+    def _notify(self):
+        with self._changed:
+            self._seq += 1
+            self._changed.notify_all()
+
+    def _sample_loop(self):
+        while not self._stopped.wait(SAMPLE_INTERVAL):
+            running = [run for run in list(self.runs.values()) if run.state == 'running']
+            for run in running:
+                run.sample()
+            if running:
+                self._notify()
+
+    def wait_for_change(self, seq, timeout):
+        """Block until something changed after seq (or timeout); returns the current sequence number"""
+        with self._changed:
+            self._changed.wait_for(lambda: self._seq != seq or self._stopped.is_set(), timeout)
+            return self._seq
+
+    def start(self):
+        self._devnull = open(os.devnull, 'w')
+        self._server = ThreadingHTTPServer((self.host, self.port), make_handler(self))
+        self._server.daemon_threads = True
+        # Port 0 picks a free port
+        self.port = self._server.server_address[1]
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        threading.Thread(target=self._sample_loop, daemon=True).start()
+        return self
+
+    def stop(self):
+        """Cancel every run, then shut the server down"""
+        self._stopped.set()
+        self._notify()
+        for run in list(self.runs.values()):
+            if run.state == 'running':
+                run.engine.cancel()
+        for run in list(self.runs.values()):
+            run.thread.join(5)
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+        if self._devnull:
+            self._devnull.close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+def make_handler(dashboard):
+    class DashboardHandler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def local_host(self):
+            # Refuse other Host names, so a web page cannot reach the API through DNS rebinding
+            host = (self.headers.get('Host') or '').rsplit(':', 1)[0]
+            return host in ('127.0.0.1', 'localhost', '[::1]')
+
+        def send_json(self, payload, status=200):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if not self.local_host():
+                self.send_error(403)
+                return
+            path = self.path.split('?')[0]
+            if path == '/events':
+                self.stream_events()
+            elif path == '/api/targets':
+                self.send_json({'targets': dashboard.targets()})
+            elif path == '/api/runs':
+                self.send_json(dashboard.state(history=True))
+            else:
+                self.send_static(path)
+
+        def do_POST(self):
+            # A JSON body cannot be sent cross-origin without a preflight, which this server never answers
+            if not self.local_host() or self.headers.get('Content-Type', '').split(';')[0] != 'application/json':
+                self.send_error(403)
+                return
+            try:
+                length = int(self.headers.get('Content-Length') or 0)
+                request = json.loads(self.rfile.read(length) or b'{}')
+                name = request['target']
+            except (ValueError, KeyError, TypeError):
+                self.send_json({'error': 'expected a JSON body with a "target"'}, 400)
+                return
+            path = self.path.split('?')[0]
+            if path == '/api/start':
+                try:
+                    limit = int(request['limit']) if request.get('limit') else None
+                    run = dashboard.start_run(name, request.get('wordlist') or None, limit)
+                except KeyError:
+                    self.send_json({'error': f"unknown target {name}"}, 404)
+                except ValueError as e:
+                    self.send_json({'error': str(e)}, 409)
+                else:
+                    self.send_json(run.view())
+            elif path == '/api/stop':
+                if dashboard.stop_run(name):
+                    self.send_json({'stopping': name})
+                else:
+                    self.send_json({'error': f"{name} is not running"}, 409)
+            else:
+                self.send_error(404)
+
+        def send_static(self, path):
+            name = 'index.html' if path == '/' else path.lstrip('/')
+            # Only files directly inside webui/, so no path can climb out of it
+            file = WEBUI_DIR / name
+            if '/' in name or not file.is_file():
+                self.send_error(404)
+                return
+            body = file.read_bytes()
+            self.send_response(200)
+            self.send_header('Content-Type', mimetypes.guess_type(name)[0] or 'application/octet-stream')
+            self.send_header('Content-Length', str(len(body)))
+            self.send_header('Cache-Control', 'no-cache')
+            self.end_headers()
+            self.wfile.write(body)
+
+        def stream_events(self):
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream')
+            self.send_header('Cache-Control', 'no-cache')
+            self.end_headers()
+            seq = dashboard._seq
+            event = 'snapshot'
+            try:
+                while not dashboard._stopped.is_set():
+                    state = dashboard.state(history=event == 'snapshot')
+                    self.wfile.write(f"event: {event}\ndata: {json.dumps(state)}\n\n".encode())
+                    self.wfile.flush()
+                    event = 'stats'
+                    # Wake on every sample or run change; a comment every 15s keeps idle connections open
+                    new_seq = dashboard.wait_for_change(seq, 15)
+                    while new_seq == seq and not dashboard._stopped.is_set():
+                        self.wfile.write(b": keep-alive\n\n")
+                        self.wfile.flush()
+                        new_seq = dashboard.wait_for_change(seq, 15)
+                    seq = new_seq
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+
+    return DashboardHandler
+
+def serve_dashboard(port=DEFAULT_PORT, targets_files=None, wordlist=None, limit=None, overrides=None):
+    """Serve the dashboard until Ctrl+C"""
+    with Dashboard(port, targets_files, wordlist, limit, overrides=overrides) as dashboard:
+        print(f"[+] Dashboard running at {dashboard.url} (local only), Ctrl+C to stop")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            print("\n[+] Stopping dashboard and any runs it started...")
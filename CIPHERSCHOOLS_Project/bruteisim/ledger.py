@@ -0,0 +1,166 @@
+"""
+Attempt Ledger for Brute Force Testing
+A SQLite file remembering which passwords have been tried against which target
+(URL and username), so an interrupted run resumes where it stopped and no run
+repeats a candidate an earlier one already tried, whatever wordlist it came from.
+
+Two tables: attempts holds one row per (url, username, password) with its
+verdict; entries holds the wordlist entries already covered, per wordlist
+digest, from which the resume position (the first entry not covered) is found.
+Workers hand completed attempts to a queue and one thread (a
+logwriter.BackgroundWriter) commits them in batched transactions, so attempts
+never wait on the disk.
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+
+from logwriter import BackgroundWriter
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS attempts (
+    url TEXT NOT NULL,
+    username TEXT NOT NULL,
+    password TEXT NOT NULL,
+    verdict TEXT NOT NULL,
+    tried_at REAL NOT NULL,
+    PRIMARY KEY (url, username, password)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS entries (
+    url TEXT NOT NULL,
+    username TEXT NOT NULL,
+    wordlist TEXT NOT NULL,
+    entry INTEGER NOT NULL,
+    PRIMARY KEY (url, username, wordlist, entry)
+) WITHOUT ROWID;
+"""
+
+# Entries covered up to the resume position: the end of the run of consecutive entries starting at 0
+RESUME_QUERY = """
+SELECT MIN(e.entry) + 1 FROM entries AS e
+WHERE e.url = ? AND e.username = ? AND e.wordlist = ? AND NOT EXISTS (
+    SELECT 1 FROM entries WHERE url = e.url AND username = e.username AND wordlist = e.wordlist AND entry = e.entry + 1)
+"""
+
+def wordlist_digest(path):
+    """Identify a wordlist file by its contents, so a renamed copy resumes and an edited one starts over"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def connect(path, check_same_thread=True):
+    # WAL lets lookups read while the writer commits, and shard processes share the file
+    db = sqlite3.connect(path, timeout=30, check_same_thread=check_same_thread)
+    db.execute('PRAGMA journal_mode=WAL')
+    db.execute('PRAGMA synchronous=NORMAL')
+    return db
+
+class AttemptLedger(BackgroundWriter):
+    """The attempts of one target (url, username) and, with a wordlist digest, its entries.
+
+    record() queues one completed attempt; a background thread commits every
+    batch_size attempts or flush_interval seconds, whichever comes first, and
+    close() commits the rest. A shard's ledger maps its wordlist indices to
+    index * shards + shard, like its log records.
+    """
+    def __init__(self, path, url, username, wordlist=None, shard=0, shards=1, batch_size=512, flush_interval=1.0):
+        super().__init__('ledger-writer', flush_interval, batch_size, sync_every=batch_size)
+        self.path = path
+        self.url = url
+        self.username = username or ''
+        self.wordlist = wordlist
+        self.shard = shard
+        self.shards = shards
+        self.flush_interval = flush_interval
+        self.recorded = 0
+        self.skipped = 0
+        self._db = connect(path, check_same_thread=False)
+        self._db.executescript(SCHEMA)
+        self._db_lock = threading.Lock()
+        # Only used by the writer thread
+        self._writer_db = connect(path, check_same_thread=False)
+        self._batch = []
+        # Queued but not yet committed, so lookups see them too
+        self._pending = set()
+        self._pending_lock = threading.Lock()
+        self._start()
+
+    def _query(self, sql, *params):
+        with self._db_lock:
+            return self._db.execute(sql, params).fetchone()
+
+    def found(self):
+        """A password an earlier run found for this target, or None"""
+        row = self._query("SELECT password FROM attempts WHERE url = ? AND username = ? AND verdict = 'success' LIMIT 1",
+                          self.url, self.username)
+        return row[0] if row else None
+
+    def resume_position(self):
+        """Index of the first wordlist entry no run has covered yet (0 without a wordlist digest)"""
+        if self.wordlist is None:
+            return 0
+        key = (self.url, self.username, self.wordlist)
+        if not self._query("SELECT 1 FROM entries WHERE url = ? AND username = ? AND wordlist = ? AND entry = 0", *key):
+            return 0
+        return self._query(RESUME_QUERY, *key)[0]
+
+    def start(self):
+        """How many of this shard's own entries lie before the resume position"""
+        position = self.resume_position()
+        return max(0, -(-(position - self.shard) // self.shards))
+
+    def tried(self, password):
+        """True if any run has already tried password against this target"""
+        with self._pending_lock:
+            if password in self._pending:
+                return True
+        return self._query("SELECT 1 FROM attempts WHERE url = ? AND username = ? AND password = ?",
+                           self.url, self.username, password) is not None
+
+    def _entry(self, index):
+        if index is None or self.wordlist is None:
+            return None
+        return index * self.shards + self.shard
+
+    def record(self, password, index, verdict):
+        """Queue one completed attempt; index is its position in this run's wordlist, or None"""
+        if self._closed:
+            return
+        with self._pending_lock:
+            self._pending.add(password)
+            self.recorded += 1
+        self._put((password, verdict, time.time(), self._entry(index)))
+
+    def skip(self, index):
+        """Mark an entry as covered because an earlier attempt already tried its password"""
+        self.skipped += 1
+        entry = self._entry(index)
+        if entry is not None:
+            self._put((None, None, None, entry))
+
+    def close(self):
+        if self._closed:
+            return
+        super().close()
+        self._writer_db.close()
+        with self._db_lock:
+            self._db.close()
+
+    def _write(self, records):
+        self._batch.extend(records)
+
+    def _sync(self):
+        batch, self._batch = self._batch, []
+        db = self._writer_db
+        attempts = [(self.url, self.username, password, verdict, tried_at)
+                    for password, verdict, tried_at, _ in batch if password is not None]
+        entries = [(self.url, self.username, self.wordlist, entry) for _, _, _, entry in batch if entry is not None]
+        with db:
+            db.executemany("INSERT OR IGNORE INTO attempts VALUES (?, ?, ?, ?, ?)", attempts)
+            db.executemany("INSERT OR IGNORE INTO entries VALUES (?, ?, ?, ?)", entries)
+        with self._pending_lock:
+            self._pending.difference_update(password for password, *_ in batch)
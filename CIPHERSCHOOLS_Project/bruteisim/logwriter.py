@@ -0,0 +1,159 @@
+"""
+Background Log Writer for Brute Force Testing
+Workers hand log records to a queue; one thread batches them into the logfile,
+so attempts never wait on file I/O. Supports plain text and JSON Lines output.
+BackgroundWriter is that queue and thread, also used by the attempt ledger.
+"""
+
+import json
+import os
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+
+LOG_FORMATS = ('text', 'jsonl')
+# How often flush() checks that the writer thread is still alive
+FLUSH_POLL = 0.1
+
+class BackgroundWriter:
+    """One thread that drains a queue of records in batches, so callers never wait on I/O.
+
+    Subclasses implement _write(records), called with at most batch_size records
+    at a time, and _sync(), which makes everything written since the last call
+    durable. _sync() runs sync_interval seconds after the previous one if
+    anything was written, once sync_every records are waiting (if set), on
+    flush() and on close(). Subclasses call _start() once they are set up.
+
+    If _write() or _sync() raises, the thread stops and keeps the exception in
+    error: later records are dropped, and flush() raises it instead of waiting.
+    """
+    def __init__(self, name, sync_interval=1.0, batch_size=512, sync_every=None):
+        self.sync_interval = sync_interval
+        self.batch_size = batch_size
+        self.sync_every = sync_every
+        self._queue = queue.Queue()
+        self._closed = False
+        self.error = None
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+
+    def _start(self):
+        self._thread.start()
+
+    def _put(self, record):
+        if not self._closed and self.error is None:
+            self._queue.put(record)
+
+    def flush(self):
+        """Block until everything queued so far is written and synced; raises the error that stopped the thread"""
+        if self._closed:
+            return
+        done = threading.Event()
+        self._queue.put(done)
+        # A thread that died on an error never sets done
+        while not done.wait(FLUSH_POLL) and self._thread.is_alive():
+            pass
+        if self.error is not None:
+            raise self.error
+
+    def close(self):
+        """Write and sync what is queued, then stop the thread"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _write(self, records):
+        raise NotImplementedError
+
+    def _sync(self):
+        raise NotImplementedError
+
+    def _run(self):
+        try:
+            self._drain()
+        except Exception as e:
+            self.error = e
+
+    def _drain(self):
+        last_sync = time.monotonic()
+        unsynced = 0
+        while True:
+            timeout = max(0.0, self.sync_interval - (time.monotonic() - last_sync)) if unsynced else None
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = False  # sync deadline reached with nothing new
+            records = []
+            waiters = []
+            stop = False
+            # Drain whatever else is already queued into the same batch
+            while True:
+                if item is None:
+                    stop = True
+                elif isinstance(item, threading.Event):
+                    waiters.append(item)
+                elif item is not False:
+                    records.append(item)
+                if stop or len(records) >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            if records:
+                self._write(records)
+                unsynced += len(records)
+            if unsynced and (waiters or stop or time.monotonic() - last_sync >= self.sync_interval
+                             or (self.sync_every and unsynced >= self.sync_every)):
+                self._sync()
+                last_sync = time.monotonic()
+                unsynced = 0
+            for waiter in waiters:
+                waiter.set()
+            if stop:
+                return
+
+class LogWriter(BackgroundWriter):
+    def __init__(self, path, fmt='text', fsync_interval=1.0, batch_size=512):
+        if fmt not in LOG_FORMATS:
+            raise ValueError(f"Unknown log format: {fmt}")
+        super().__init__('log-writer', fsync_interval, batch_size)
+        self.path = path
+        self.fmt = fmt
+        self.fsync_interval = fsync_interval
+        self._file = open(path, 'a')
+        self._start()
+
+    def write(self, message, **fields):
+        """Queue one record; fields are only written in jsonl format"""
+        self._put((time.time(), message, fields))
+
+    def close(self):
+        if self._closed:
+            return
+        super().close()
+        self._file.close()
+
+    def _format(self, record):
+        timestamp, message, fields = record
+        if self.fmt == 'text':
+            return message + '\n'
+        entry = {'timestamp': datetime.fromtimestamp(timestamp, timezone.utc).isoformat(timespec='milliseconds')}
+        entry.update(fields)
+        entry['message'] = message
+        return json.dumps(entry) + '\n'
+
+    def _write(self, records):
+        self._file.write(''.join(self._format(record) for record in records))
+
+    def _sync(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
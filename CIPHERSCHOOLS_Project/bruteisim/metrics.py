@@ -0,0 +1,297 @@
+"""
+Run Statistics for Brute Force Testing
+Thread-safe attempt counters and a fixed-bucket latency histogram whose size
+does not depend on the length of the run, exported as a periodically rewritten
+JSON file and/or a local Prometheus text endpoint
+"""
+
+import bisect
+import json
+import os
+import threading
+import time
+from collections import Counter, deque
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# Bucket upper bounds in seconds, 0.5ms to ~2 minutes, each ~19% wider than the last
+LATENCY_BUCKETS = [0.0005 * 2 ** (i / 4) for i in range(72)]
+# Window for the instantaneous attempts/sec rate
+RATE_WINDOW = 5.0
+
+class RunStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = time.monotonic()
+        self.attempts = 0
+        self.total = None
+        self.verdicts = Counter()
+        self.errors = Counter()
+        self.retries = 0
+        # Current in-flight limit, set by scheduler.Scheduler
+        self.concurrency = None
+        # Every request is observed, retried ones included, so these can exceed attempts
+        self.latency_sum = 0.0
+        self.latency_count = 0
+        # One extra bucket for anything slower than the last bound
+        self._buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        # [second, attempts completed in that second] for the last RATE_WINDOW seconds
+        self._recent = deque()
+
+    def _observe(self, latency):
+        self._buckets[bisect.bisect_left(LATENCY_BUCKETS, latency)] += 1
+        self.latency_sum += latency
+        self.latency_count += 1
+
+    def _count_recent(self, n):
+        second = int(time.monotonic())
+        if self._recent and self._recent[-1][0] == second:
+            self._recent[-1][1] += n
+        else:
+            self._recent.append([second, n])
+            while self._recent[0][0] <= second - RATE_WINDOW:
+                self._recent.popleft()
+
+    def record(self, verdict, latency):
+        """Count one completed attempt and its request latency in seconds"""
+        with self._lock:
+            self.attempts += 1
+            self.verdicts[verdict.value] += 1
+            self._observe(latency)
+            self._count_recent(1)
+
+    def record_error(self, kind, latency, final=True):
+        """Count one failed request by kind (timeout, refused, ...); final if its password will not be retried"""
+        with self._lock:
+            if final:
+                self.attempts += 1
+                self._count_recent(1)
+            self.errors[kind] += 1
+            self._observe(latency)
+
+    def record_retry(self):
+        """Count one attempt that is being sent again after an error"""
+        with self._lock:
+            self.retries += 1
+
+    def drain(self):
+        """Return and reset everything counted since the last drain, for merge() into another RunStats"""
+        with self._lock:
+            delta = {
+                'attempts': self.attempts,
+                'verdicts': dict(self.verdicts),
+                'errors': dict(self.errors),
+                'retries': self.retries,
+                'latency_sum': self.latency_sum,
+                'latency_count': self.latency_count,
+                'buckets': self._buckets,
+                'concurrency': self.concurrency,
+            }
+            self.attempts = 0
+            self.verdicts = Counter()
+            self.errors = Counter()
+            self.retries = 0
+            self.latency_sum = 0.0
+            self.latency_count = 0
+            self._buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        return delta
+
+    def merge(self, delta):
+        """Add counts drained from another RunStats, e.g. one per shard process"""
+        with self._lock:
+            self.attempts += delta['attempts']
+            self.verdicts.update(delta['verdicts'])
+            self.errors.update(delta['errors'])
+            self.retries += delta['retries']
+            self.latency_sum += delta['latency_sum']
+            self.latency_count += delta['latency_count']
+            for i, n in enumerate(delta['buckets']):
+                self._buckets[i] += n
+            if delta['attempts']:
+                self._count_recent(delta['attempts'])
+
+    def current_rate(self):
+        """Attempts/sec over the last RATE_WINDOW seconds"""
+        now = time.monotonic()
+        window = min(RATE_WINDOW, now - self.started)
+        with self._lock:
+            recent = sum(n for second, n in self._recent if second > now - RATE_WINDOW)
+        return recent / window if window > 0 else 0.0
+
+    def histogram(self):
+        """Cumulative (upper_bound, count) pairs; the last bound is infinity"""
+        with self._lock:
+            buckets = list(self._buckets)
+        pairs = []
+        cumulative = 0
+        for bound, n in zip(LATENCY_BUCKETS + [float('inf')], buckets):
+            cumulative += n
+            pairs.append((bound, cumulative))
+        return pairs
+
+    def percentile(self, q):
+        """Estimate the q-th latency percentile (0-100) in seconds, interpolating inside the bucket"""
+        with self._lock:
+            buckets = list(self._buckets)
+        count = sum(buckets)
+        if not count:
+            return None
+        rank = q / 100 * count
+        seen = 0
+        for i, n in enumerate(buckets):
+            if n and seen + n >= rank:
+                low = LATENCY_BUCKETS[i - 1] if i > 0 else 0.0
+                high = LATENCY_BUCKETS[i] if i < len(LATENCY_BUCKETS) else low * 2
+                return low + (high - low) * (rank - seen) / n
+            seen += n
+        return LATENCY_BUCKETS[-1]
+
+    def elapsed(self):
+        return time.monotonic() - self.started
+
+    def snapshot(self):
+        """Plain-dict view of the run so far, suitable for JSON output"""
+        elapsed = self.elapsed()
+        with self._lock:
+            attempts = self.attempts
+            verdicts = dict(self.verdicts)
+            errors = dict(self.errors)
+            retries = self.retries
+            latency_sum = self.latency_sum
+            latency_count = self.latency_count
+            buckets = list(self._buckets)
+        return {
+            'elapsed': round(elapsed, 3),
+            'attempts': attempts,
+            'total': self.total,
+            'attempts_per_sec': round(attempts / elapsed, 2) if elapsed > 0 else 0.0,
+            'current_attempts_per_sec': round(self.current_rate(), 2),
+            'latency_mean': latency_sum / latency_count if latency_count else None,
+            'latency_sum': round(latency_sum, 6),
+            'latency_count': latency_count,
+            'latency_p50': self.percentile(50),
+            'latency_p90': self.percentile(90),
+            'latency_p99': self.percentile(99),
+            # Non-empty buckets only: [upper bound in seconds, requests in bucket]
+            'latency_histogram': [[round(bound, 6), n] for bound, n in zip(LATENCY_BUCKETS, buckets) if n],
+            'verdicts': verdicts,
+            'errors': errors,
+            'retries': retries,
+            'concurrency': self.concurrency,
+        }
+
+def write_stats_file(stats, path):
+    """Atomically replace path with the current snapshot, so readers never see a partial file"""
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w') as f:
+        json.dump(stats.snapshot(), f, indent=2)
+    os.replace(tmp, path)
+
+def prometheus_text(stats, prefix='bruteisim'):
+    """Render the stats in the Prometheus text exposition format"""
+    snap = stats.snapshot()
+    lines = [
+        f"# HELP {prefix}_attempts_total Completed login attempts",
+        f"# TYPE {prefix}_attempts_total counter",
+        f"{prefix}_attempts_total {snap['attempts']}",
+        f"# HELP {prefix}_verdicts_total Completed attempts by verdict",
+        f"# TYPE {prefix}_verdicts_total counter",
+    ]
+    lines += [f'{prefix}_verdicts_total{{verdict="{v}"}} {n}' for v, n in sorted(snap['verdicts'].items())]
+    lines += [
+        f"# HELP {prefix}_errors_total Requests that got no usable answer, by kind (timeout, refused, reset, server, other)",
+        f"# TYPE {prefix}_errors_total counter",
+    ]
+    lines += [f'{prefix}_errors_total{{type="{t}"}} {n}' for t, n in sorted(snap['errors'].items())]
+    lines += [
+        f"# HELP {prefix}_retries_total Attempts sent again after an error",
+        f"# TYPE {prefix}_retries_total counter",
+        f"{prefix}_retries_total {snap['retries']}",
+        f"# HELP {prefix}_attempts_per_second Attempts/sec over the last {RATE_WINDOW:g}s",
+        f"# TYPE {prefix}_attempts_per_second gauge",
+        f"{prefix}_attempts_per_second {snap['current_attempts_per_sec']}",
+    ]
+    if snap['concurrency'] is not None:
+        lines += [
+            f"# HELP {prefix}_concurrency Current limit on requests in flight",
+            f"# TYPE {prefix}_concurrency gauge",
+            f"{prefix}_concurrency {snap['concurrency']}",
+        ]
+    lines += [
+        f"# HELP {prefix}_attempt_latency_seconds Request latency of login attempts, retried requests included",
+        f"# TYPE {prefix}_attempt_latency_seconds histogram",
+    ]
+    histogram = stats.histogram()
+    # Every 4th bound doubles the previous one, which keeps the series count small
+    for i, (bound, cumulative) in enumerate(histogram):
+        if i % 4 == 3 or bound == float('inf'):
+            le = '+Inf' if bound == float('inf') else f"{bound:.6g}"
+            lines.append(f'{prefix}_attempt_latency_seconds_bucket{{le="{le}"}} {cumulative}')
+    lines += [
+        f"{prefix}_attempt_latency_seconds_sum {snap['latency_sum']:.6f}",
+        # The +Inf bucket's count, read under the same lock as the other buckets
+        f"{prefix}_attempt_latency_seconds_count {histogram[-1][1]}",
+    ]
+    return '\n'.join(lines) + '\n'
+
+class StatsExporter:
+    """Publishes a RunStats while a run is in progress.
+
+    stats_file is rewritten every `interval` seconds and once more on stop();
+    metrics_port serves Prometheus text at http://127.0.0.1:<port>/metrics.
+    """
+    def __init__(self, stats, stats_file=None, interval=2.0, metrics_port=None, host='127.0.0.1'):
+        self.stats = stats
+        self.stats_file = stats_file
+        self.interval = interval
+        self.metrics_port = metrics_port
+        self.host = host
+        self._stopped = threading.Event()
+        self._thread = None
+        self._server = None
+
+    def start(self):
+        if self.stats_file:
+            self._thread = threading.Thread(target=self._write_loop, daemon=True)
+            self._thread.start()
+        if self.metrics_port is not None:
+            stats = self.stats
+
+            class MetricsHandler(BaseHTTPRequestHandler):
+                def log_message(self, format, *args):
+                    pass
+
+                def do_GET(self):
+                    if self.path.split('?')[0] != '/metrics':
+                        self.send_error(404)
+                        return
+                    payload = prometheus_text(stats).encode()
+                    self.send_response(200)
+                    self.send_header('Content-Type', 'text/plain; version=0.0.4')
+                    self.send_header('Content-Length', str(len(payload)))
+                    self.end_headers()
+                    self.wfile.write(payload)
+
+            self._server = ThreadingHTTPServer((self.host, self.metrics_port), MetricsHandler)
+            self._server.daemon_threads = True
+            threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def _write_loop(self):
+        while not self._stopped.wait(self.interval):
+            write_stats_file(self.stats, self.stats_file)
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread:
+            self._thread.join()
+        if self.stats_file:
+            write_stats_file(self.stats, self.stats_file)
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
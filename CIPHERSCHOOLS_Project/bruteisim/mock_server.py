@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Mock Login Server for Brute Force Testing
+Local stand-in that imitates the login endpoints in targets_config.yaml, so the
+tool can be exercised and benchmarked without touching real hosts
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from pathlib import Path
+from urllib.parse import urlparse, parse_qs
+
+import yaml
+
+# How each profile behaves on top of its targets_config.yaml entry, whose
+# body_format (form or json) decides how logins are read and answered.
+# success_redirect / failure_redirect: path to redirect to, or None to answer inline
+MOCK_PROFILES = {
+    'acunetix_php': {'success_redirect': None, 'failure_redirect': None},
+    'acunetix_html5': {'success_redirect': None, 'failure_redirect': None},
+    'acunetix_asp': {'success_redirect': None, 'failure_redirect': None},
+    'acunetix_aspnet': {'success_redirect': None, 'failure_redirect': None},
+    'dvwa': {'success_redirect': '/dvwa/index.php', 'failure_redirect': None},
+    'juice_shop': {'success_redirect': None, 'failure_redirect': None},
+    'webgoat': {'success_redirect': '/WebGoat/welcome.mvc', 'failure_redirect': None},
+    'bwapp': {'success_redirect': '/bwapp/portal.php', 'failure_redirect': None},
+}
+
+DEFAULT_PASSWORD = 'sunshine'
+
+def load_profiles(targets_file=None):
+    """Merge targets_config.yaml entries with their mock behaviour"""
+    targets_file = targets_file or Path(__file__).parent / 'targets_config.yaml'
+    with open(targets_file, 'r') as f:
+        targets = yaml.safe_load(f) or {}
+    profiles = {}
+    for name, config in targets.items():
+        profile = dict(config)
+        profile.update(MOCK_PROFILES.get(name, {'success_redirect': None, 'failure_redirect': None}))
+        profile['path'] = urlparse(config['url']).path or '/'
+        profiles[name] = profile
+    return profiles
+
+def make_handler(profile, password=DEFAULT_PASSWORD, latency=0.0, jitter=0.0, error_rate=0.0, page_kb=4, http2=False):
+    """Build a request handler class bound to one profile and its fault settings.
+
+    With http2, connections that open with the HTTP/2 preface (prior-knowledge
+    h2c, requires the h2 package) are served as HTTP/2, each stream answered
+    on its own thread; everything else is HTTP/1.1 as usual.
+    """
+    padding = '<!-- ' + 'x' * max(0, int(page_kb * 1024) - 64) + ' -->'
+    success_page = f"<html><body><h1>{profile.get('success_indicator', 'welcome')}</h1>{padding}</body></html>"
+    failure_page = f"<html><body><p>{profile.get('failure_indicator', 'invalid')}</p><form method=\"post\">" \
+                   f"<input type=\"text\" name=\"{profile['username_field']}\">" \
+                   f"<input type=\"password\" name=\"{profile['password_field']}\"></form>{padding}</body></html>"
+    html = 'text/html; charset=utf-8'
+
+    def read_credentials(content_type, raw):
+        raw = raw.decode('utf-8', errors='replace')
+        is_json = 'json' in (content_type or '')
+        if profile.get('body_format') == 'json' and not is_json:
+            # Like the REST logins it imitates, a JSON-only profile ignores form bodies
+            return None, None
+        if is_json:
+            try:
+                data = json.loads(raw or '{}')
+            except ValueError:
+                return None, None
+            return data.get(profile['username_field']), data.get(profile['password_field'])
+        fields = parse_qs(raw)
+        return fields.get(profile['username_field'], [None])[0], fields.get(profile['password_field'], [None])[0]
+
+    def inject_faults():
+        """Sleep for the configured latency; returns an error response, 'drop', or None to answer normally"""
+        delay = latency + random.uniform(0, jitter)
+        if delay > 0:
+            time.sleep(delay)
+        if error_rate and random.random() < error_rate:
+            if random.random() < 0.5:
+                return 503, 'Service Unavailable', 'text/plain', ()
+            # Drop the connection (or HTTP/2 stream) without answering
+            return 'drop'
+        return None
+
+    def respond(method, path, content_type, raw):
+        """(status, body, content type, extra headers) for one request, or 'drop'"""
+        path = urlparse(path).path
+        if method != 'POST':
+            return 200, success_page if path == profile.get('success_redirect') else failure_page, html, ()
+        if path != profile['path']:
+            return 404, 'Not Found', 'text/plain', ()
+        username, attempt = read_credentials(content_type, raw)
+        fault = inject_faults()
+        if fault:
+            return fault
+        if username == profile.get('username') and attempt == password:
+            if profile.get('success_redirect'):
+                return 302, '', html, [('Location', profile['success_redirect']), ('Set-Cookie', 'session=mock; Path=/')]
+            if profile.get('body_format') == 'json':
+                body = json.dumps({profile.get('success_indicator', 'authentication'): {'token': 'mock', 'umail': username}})
+                return 200, body, 'application/json', ()
+            return 200, success_page, html, ()
+        if profile.get('failure_redirect'):
+            return 302, '', html, [('Location', profile['failure_redirect'])]
+        if profile.get('body_format') == 'json':
+            return 401, profile.get('failure_indicator', 'Invalid email or password.'), 'text/plain', ()
+        return 200, failure_page, html, ()
+
+    class MockLoginHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        # Send headers and body in one segment; split writes stall keep-alive
+        # clients on delayed ACKs and would dominate the measured latency
+        wbufsize = -1
+        disable_nagle_algorithm = True
+
+        def log_message(self, format, *args):
+            pass
+
+        def handle(self):
+            if http2 and self.rfile.peek(len(H2_PREFACE)).startswith(b'PRI '):
+                serve_http2(self.connection, self.rfile, respond)
+            else:
+                super().handle()
+
+        def send_page(self, status, body, content_type=html, headers=()):
+            payload = body.encode()
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(payload)))
+            for key, value in headers:
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def answer(self, method):
+            length = int(self.headers.get('Content-Length') or 0)
+            raw = self.rfile.read(length) if length else b''
+            result = respond(method, self.path, self.headers.get('Content-Type'), raw)
+            if result == 'drop':
+                self.close_connection = True
+            else:
+                self.send_page(*result)
+
+        def do_GET(self):
+            self.answer('GET')
+
+        def do_POST(self):
+            self.answer('POST')
+
+    return MockLoginHandler
+
+# First bytes of every prior-knowledge HTTP/2 connection
+H2_PREFACE = b'PRI * HTTP/2.0\r\n\r\nSM\r\n\r\n'
+
+def serve_http2(sock, rfile, respond, workers=64):
+    """Serve one HTTP/2 connection until the client closes it; respond() runs on a pool, one call per stream"""
+    from concurrent.futures import ThreadPoolExecutor
+    from h2.config import H2Configuration
+    from h2.connection import H2Connection
+    from h2.events import RequestReceived, DataReceived, StreamEnded, ConnectionTerminated
+
+    conn = H2Connection(H2Configuration(client_side=False, header_encoding='utf-8'))
+    lock = threading.Lock()
+    streams = {}
+
+    def flush():
+        data = conn.data_to_send()
+        if data:
+            sock.sendall(data)
+
+    def answer(stream_id, headers, body):
+        result = respond(headers.get(':method'), headers.get(':path', '/'), headers.get('content-type'), body)
+        with lock:
+            if result == 'drop':
+                conn.reset_stream(stream_id)
+            else:
+                status, page, content_type, extra = result
+                payload = page.encode()
+                conn.send_headers(stream_id, [(':status', str(status)), ('content-type', content_type),
+                                              ('content-length', str(len(payload)))] +
+                                  [(key.lower(), value) for key, value in extra])
+                # Pages fit the default 64 KB flow-control window, so only the frame size limits a write
+                size = conn.max_outbound_frame_size
+                for offset in range(0, len(payload), size):
+                    conn.send_data(stream_id, payload[offset:offset + size])
+                conn.end_stream(stream_id)
+            flush()
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        with lock:
+            conn.initiate_connection()
+            flush()
+        while True:
+            data = rfile.read1(65536)
+            if not data:
+                return
+            with lock:
+                events = conn.receive_data(data)
+                for event in events:
+                    if isinstance(event, RequestReceived):
+                        streams[event.stream_id] = (dict(event.headers), bytearray())
+                    elif isinstance(event, DataReceived):
+                        streams[event.stream_id][1].extend(event.data)
+                        conn.acknowledge_received_data(event.flow_controlled_length, event.stream_id)
+                    elif isinstance(event, ConnectionTerminated):
+                        flush()
+                        return
+                    elif isinstance(event, StreamEnded):
+                        headers, body = streams.pop(event.stream_id)
+                        pool.submit(answer, event.stream_id, headers, bytes(body))
+                flush()
+
+def start_mock_server(profile, host='127.0.0.1', port=0, **options):
+    """Serve one profile from a background thread; returns (server, base_url)"""
+    server = ThreadingHTTPServer((host, port), make_handler(profile, **options))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+def main():
+    profiles = load_profiles()
+    parser = argparse.ArgumentParser(description="Local mock login server imitating a targets_config.yaml profile")
+    parser.add_argument('--profile', choices=sorted(profiles), default='dvwa', help='Target profile to imitate (default: dvwa)')
+    parser.add_argument('--host', default='127.0.0.1', help='Address to bind (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8000, help='Port to listen on (default: 8000)')
+    parser.add_argument('--password', default=DEFAULT_PASSWORD, help=f'Password that logs in (default: {DEFAULT_PASSWORD})')
+    parser.add_argument('--latency', type=float, default=0.0, help='Added latency per login in seconds')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Random extra latency of up to N seconds')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of logins answered with 503 or a dropped connection')
+    parser.add_argument('--page-kb', type=float, default=4, help='Approximate size of the HTML pages in KB (default: 4)')
+    parser.add_argument('--failure-redirect', default=None, help='Redirect failed logins to this path instead of answering inline')
+    parser.add_argument('--http2', action='store_true', help='Also serve prior-knowledge HTTP/2 (h2c) connections (requires h2)')
+    args = parser.parse_args()
+
+    profile = profiles[args.profile]
+    if args.failure_redirect:
+        profile['failure_redirect'] = args.failure_redirect
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(
+        profile, password=args.password, latency=args.latency, jitter=args.jitter,
+        error_rate=args.error_rate, page_kb=args.page_kb, http2=args.http2
+    ))
+    print(f"[+] Mock '{args.profile}' login at http://{args.host}:{server.server_address[1]}{profile['path']}")
+    print(f"[+] Username: {profile.get('username')}  Password: {args.password}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n[+] Stopping mock server")
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
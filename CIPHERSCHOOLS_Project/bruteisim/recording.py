@@ -0,0 +1,292 @@
+"""
+Response Recording for Brute Force Testing
+Archives the responses of a run (status, headers, cookies, redirect chain and
+the body bytes the classifier saw) so success/failure rules can be tuned
+offline: `replay` runs a classifier over every recorded response at CPU speed,
+without sending a request, and reports what it would have decided.
+
+Layout (little-endian): magic, then one record per response as a uint32
+length and a zlib stream, then a uint64 offset per record and a trailer
+(count, index offset, end magic). Record 0 is the compression dictionary (the
+first response recorded), which every other record is compressed against, so
+near-identical failure pages take a few bytes each. An archive whose run died
+before close() has no trailer and is read by following the length prefixes.
+"""
+
+import argparse
+import json
+import os
+import struct
+import sys
+import threading
+import time
+import zlib
+from array import array
+from collections import Counter
+
+MAGIC = b'BRUTREC1'
+END_MAGIC = b'BRUTRECX'
+LENGTH = struct.Struct('<I')
+TRAILER = struct.Struct('<QQ8s')
+# The dictionary is at most zlib's 32 KB window
+MAX_DICTIONARY = 32 * 1024
+
+def cookie_dict(cookies):
+    """Cookie name -> value from a requests cookie jar, an aiohttp SimpleCookie or a dict"""
+    if hasattr(cookies, 'get_dict'):
+        return cookies.get_dict()
+    return {name: getattr(value, 'value', value) for name, value in (cookies or {}).items()}
+
+def response_meta(response):
+    """The parts of a requests-style response the classifier can look at, as plain JSON data"""
+    return {
+        'status': response.status_code,
+        'url': str(response.url),
+        'headers': [[k, v] for k, v in response.headers.items()],
+        'cookies': cookie_dict(response.cookies),
+        'encoding': response.encoding,
+        'history': [{'status': r.status_code, 'url': str(r.url), 'headers': [[k, v] for k, v in r.headers.items()],
+                     'cookies': cookie_dict(r.cookies)} for r in response.history],
+    }
+
+class ResponseRecorder:
+    """Appends responses to an archive; thread-safe, and cheap enough to leave on for a whole run.
+
+    The file is created with the first response, so a run that records nothing
+    leaves none behind. A shard's recorder stores wordlist indices as
+    index * shards + shard, like its log records.
+    """
+    def __init__(self, path, level=6, shard=0, shards=1):
+        self.path = path
+        self.level = level
+        self.shard = shard
+        self.shards = shards
+        self.count = 0
+        self._lock = threading.Lock()
+        self._file = None
+        self._offsets = array('Q')
+        self._dictionary = None
+        self._closed = False
+
+    def _append(self, blob):
+        offset = self._file.tell()
+        self._file.write(LENGTH.pack(len(blob)))
+        self._file.write(blob)
+        return offset
+
+    def record(self, response, body=None, password=None, index=None, verdict=None, latency=None):
+        """Archive one classified response; body is the (possibly truncated) bytes when it was streamed"""
+        meta = response_meta(response)
+        if index is not None:
+            index = index * self.shards + self.shard
+        meta.update(password=password, index=index, verdict=verdict, latency=latency, truncated=body is not None)
+        content = response.content if body is None else body
+        payload = json.dumps(meta, separators=(',', ':')).encode() + b'\0' + content
+        with self._lock:
+            if self._closed:
+                return
+            if self._file is None:
+                self._file = open(self.path, 'wb')
+                self._file.write(MAGIC)
+                self._dictionary = payload[:MAX_DICTIONARY]
+                self._append(zlib.compress(self._dictionary, self.level))
+            dictionary = self._dictionary
+        # Compress outside the lock, so workers only wait on each other to append
+        compressor = zlib.compressobj(self.level, zdict=dictionary)
+        blob = compressor.compress(payload) + compressor.flush()
+        with self._lock:
+            if self._closed:
+                return
+            self._offsets.append(self._append(blob))
+            self.count += 1
+
+    def close(self):
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            if self._file is None:
+                return
+            index_offset = self._file.tell()
+            offsets = self._offsets
+            if sys.byteorder != 'little':
+                offsets.byteswap()
+            offsets.tofile(self._file)
+            self._file.write(TRAILER.pack(self.count, index_offset, END_MAGIC))
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class RecordArchive:
+    """Read-only view of an archive: len(), archive[n] and iteration give (meta, body) pairs"""
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._data = f.read()
+        if not self._data.startswith(MAGIC):
+            raise ValueError(f"{path} is not a response archive")
+        self.complete = False
+        self.offsets = self._read_index()
+        self.dictionary = b''
+        if len(self._data) > len(MAGIC):
+            self.dictionary = zlib.decompress(self._blob(len(MAGIC)))
+
+    def _blob(self, offset):
+        (length,) = LENGTH.unpack_from(self._data, offset)
+        start = offset + LENGTH.size
+        return self._data[start:start + length]
+
+    def _read_index(self):
+        if len(self._data) >= len(MAGIC) + TRAILER.size:
+            count, index_offset, end = TRAILER.unpack_from(self._data, len(self._data) - TRAILER.size)
+            if end == END_MAGIC:
+                self.complete = True
+                offsets = array('Q')
+                offsets.frombytes(self._data[index_offset:index_offset + count * 8])
+                if sys.byteorder != 'little':
+                    offsets.byteswap()
+                return offsets
+        # No trailer: follow the length prefixes, skipping the dictionary and any torn last record
+        offsets = array('Q')
+        offset = len(MAGIC)
+        first = True
+        while offset + LENGTH.size <= len(self._data):
+            (length,) = LENGTH.unpack_from(self._data, offset)
+            if offset + LENGTH.size + length > len(self._data):
+                break
+            if not first:
+                offsets.append(offset)
+            first = False
+            offset += LENGTH.size + length
+        return offsets
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def __getitem__(self, n):
+        decompressor = zlib.decompressobj(zdict=self.dictionary)
+        payload = decompressor.decompress(self._blob(self.offsets[n])) + decompressor.flush()
+        meta, _, body = payload.partition(b'\0')
+        return json.loads(meta), body
+
+    def __iter__(self):
+        for n in range(len(self)):
+            yield self[n]
+
+def recorded_response(meta, body):
+    """Rebuild a response object the engine's classify_response() accepts"""
+    from requests.structures import CaseInsensitiveDict
+    from bruteisim import AsyncResponse
+    history = [AsyncResponse(hop['status'], hop['url'], b'', headers=CaseInsensitiveDict(hop['headers']),
+                             cookies=hop['cookies']) for hop in meta['history']]
+    return AsyncResponse(meta['status'], meta['url'], body, history, CaseInsensitiveDict(meta['headers']),
+                         meta['encoding'], meta['cookies'])
+
+def replay_verdict(classifier, response, body=None):
+    """Verdict the engine would reach for a recorded response under classifier's rules.
+
+    Mirrors bruteisim.classify_response without its fingerprint cache: every
+    record is a different response, so masking and hashing would cost more than
+    the scan it can never skip.
+    """
+    from bruteisim import decode_body
+    # Recorded with redirects followed but replayed without: the first hop decides if its head can
+    first = response.history[0] if response.history else response
+    if not classifier.follow_redirects:
+        verdict = classifier.classify_head(first.status_code, first.headers.get('Location'), first.cookies)
+        if verdict is not None:
+            return verdict
+    return classifier.classify_text(decode_body(response, body), redirected=bool(response.history))
+
+def replay(paths, classifier, password=None):
+    """Classify every response in the archives; returns (rows, elapsed seconds).
+
+    Each row is (meta, new verdict, expected verdict): with password, only that
+    password is expected to succeed, otherwise the verdict recorded live is expected.
+    """
+    rows = []
+    started = time.perf_counter()
+    max_bytes = classifier.max_body_bytes
+    for path in paths:
+        for meta, body in RecordArchive(path):
+            if max_bytes is not None:
+                body = body[:max_bytes]
+            verdict = replay_verdict(classifier, recorded_response(meta, body), body if max_bytes is not None else None)
+            if password is not None:
+                expected = 'success' if meta['password'] == password else 'not success'
+            else:
+                expected = meta['verdict']
+            rows.append((meta, verdict.value, expected))
+    return rows, time.perf_counter() - started
+
+def matches(verdict, expected):
+    if expected == 'not success':
+        return verdict != 'success'
+    return verdict == expected
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect and replay recorded responses against success/failure rules, offline")
+    commands = parser.add_subparsers(dest='command', required=True)
+    replay_cmd = commands.add_parser('replay', help='Classify every recorded response and report verdicts and mismatches')
+    replay_cmd.add_argument('archives', nargs='+', help='Archives written by bruteisim.py --record (one per shard with --processes)')
+    replay_cmd.add_argument('--config', help='YAML config to take the rules from (flags below override it)', default=None)
+    for flag in ('success-indicator', 'failure-indicator', 'success-regex', 'failure-regex', 'success-status',
+                 'failure-status', 'success-location', 'failure-location', 'success-cookie'):
+        replay_cmd.add_argument(f'--{flag}', default=None)
+    replay_cmd.add_argument('--follow-redirects', choices=['true', 'false'], default=None,
+                            help='Classify as if redirects were (not) followed')
+    replay_cmd.add_argument('--max-body-kb', type=float, default=None)
+    replay_cmd.add_argument('--password', help='The correct password: only its responses should be SUCCESS (default: compare with the verdicts recorded live)', default=None)
+    replay_cmd.add_argument('--show', type=int, help='Mismatches to print (default: 20)', default=20)
+    info_cmd = commands.add_parser('info', help='Show what an archive holds')
+    info_cmd.add_argument('archives', nargs='+')
+    args = parser.parse_args()
+
+    if args.command == 'info':
+        for path in args.archives:
+            archive = RecordArchive(path)
+            verdicts = Counter(meta['verdict'] for meta, _ in archive)
+            note = '' if archive.complete else ' (no index: the recording run did not finish cleanly)'
+            print(f"[+] {path}: {len(archive)} responses in {os.path.getsize(path) / 1024:.1f} KB{note}")
+            print(f"[+] Recorded verdicts: {dict(verdicts)}")
+        return
+
+    from bruteisim import CONFIG_OPTIONS, load_config
+    from classifier import ResponseClassifier
+    settings = dict(load_config(args.config) or {}) if args.config else {}
+    for key in ('success_indicator', 'failure_indicator', 'success_regex', 'failure_regex', 'success_status',
+                'failure_status', 'success_location', 'failure_location', 'success_cookie', 'follow_redirects',
+                'max_body_kb'):
+        value = getattr(args, key)
+        if value is not None:
+            settings[key] = value == 'true' if key == 'follow_redirects' else value
+    rules = {}
+    for key in ('success_indicator', 'failure_indicator', 'success_regex', 'failure_regex', 'max_body_kb',
+                'follow_redirects', 'success_status', 'failure_status', 'success_location', 'failure_location',
+                'success_cookie'):
+        cast, default = CONFIG_OPTIONS[key]
+        value = settings.get(key)
+        rules[key] = cast(value) if value is not None else default
+    classifier = ResponseClassifier(**rules)
+
+    rows, elapsed = replay(args.archives, classifier, args.password)
+    verdicts = Counter(verdict for _, verdict, _ in rows)
+    mismatched = [row for row in rows if not matches(row[1], row[2])]
+    rate = len(rows) / elapsed if elapsed > 0 else 0
+    print(f"[+] Replayed {len(rows)} responses in {elapsed * 1000:.1f} ms ({rate:.0f}/s)")
+    print(f"[+] Verdicts: {dict(verdicts)}")
+    against = f"password {args.password!r}" if args.password else "the verdicts recorded live"
+    print(f"[+] {len(mismatched)} mismatches against {against}")
+    for meta, verdict, expected in mismatched[:args.show]:
+        print(f"    #{meta['index']} {meta['password']!r}: {verdict} (expected {expected}), "
+              f"status {meta['status']}, {meta['url']}")
+    if len(mismatched) > args.show:
+        print(f"    ... {len(mismatched) - args.show} more")
+    sys.exit(1 if mismatched else 0)
+
+if __name__ == "__main__":
+    main()
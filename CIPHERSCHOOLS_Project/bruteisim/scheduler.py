@@ -0,0 +1,352 @@
+"""
+Request Scheduler for Brute Force Testing
+Global pacing shared by all workers of a run: an exact fixed-rate token bucket
+and/or an adaptive (AIMD) concurrency limit that grows while the target stays
+fast and backs off on 429/503, timeouts or rising latency. HostLimits caps the
+requests in flight per host across several runs at once. Failed attempts wait
+in a RetryQueue with exponential backoff instead of holding a worker, and a
+CircuitBreaker pauses the whole run while the target looks down.
+"""
+
+import heapq
+import itertools
+import random
+import threading
+import time
+from collections import Counter, defaultdict
+
+# Status codes that mean "slow down"
+THROTTLE_STATUS = (429, 503)
+# What went wrong with a request that got no usable answer
+ERROR_KINDS = ('timeout', 'refused', 'reset', 'server', 'other')
+# Exception types (from requests/urllib3/http.client/aiohttp/httpx) meaning the connection was dropped mid-request
+RESET_ERROR_NAMES = {'RemoteDisconnected', 'ProtocolError', 'ChunkedEncodingError', 'IncompleteRead',
+                     'ServerDisconnectedError', 'ClientPayloadError', 'RemoteProtocolError', 'ReadError', 'WriteError'}
+
+def classify_error(exc):
+    """Kind of a failed request, one of ERROR_KINDS except 'server' (a 5xx answer is not an exception).
+
+    Looks through the whole chain of wrapped exceptions, so it works the same for
+    requests, aiohttp and httpx without importing any of them.
+    """
+    seen = set()
+    names = set()
+    stack = [exc]
+    while stack:
+        error = stack.pop()
+        if not isinstance(error, BaseException) or id(error) in seen:
+            continue
+        seen.add(id(error))
+        if isinstance(error, ConnectionRefusedError):
+            return 'refused'
+        if isinstance(error, (ConnectionResetError, ConnectionAbortedError, BrokenPipeError)):
+            return 'reset'
+        if isinstance(error, TimeoutError):
+            return 'timeout'
+        names.add(type(error).__name__)
+        stack += [error.__cause__, error.__context__, getattr(error, 'reason', None), getattr(error, 'os_error', None)]
+        stack += list(error.args)
+    if any('Timeout' in name for name in names):
+        return 'timeout'
+    if names & RESET_ERROR_NAMES:
+        return 'reset'
+    return 'other'
+
+class RatePacer:
+    """Token bucket handing out send times `1/rate` seconds apart"""
+    def __init__(self, rate, burst=1):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.interval = 1.0 / rate
+        self.burst = max(1, burst)
+        self._lock = threading.Lock()
+        self._next = time.monotonic()
+
+    def reserve(self):
+        """Claim the next send slot; returns how many seconds to wait before sending"""
+        with self._lock:
+            now = time.monotonic()
+            # Idle time earns at most `burst` tokens
+            slot = max(self._next, now - (self.burst - 1) * self.interval)
+            self._next = slot + self.interval
+            return max(0.0, slot - now)
+
+    def pause(self, seconds):
+        """Push every future slot back, e.g. after a Retry-After"""
+        with self._lock:
+            self._next = max(self._next, time.monotonic() + seconds)
+
+class AdaptiveLimiter:
+    """Additive-increase / multiplicative-decrease limit on in-flight requests"""
+    def __init__(self, max_limit, min_limit=1, initial=None, latency_tolerance=2.0, cooldown=1.0):
+        self.max_limit = max(1, max_limit)
+        self.min_limit = max(1, min(min_limit, self.max_limit))
+        self.limit = initial or max(self.min_limit, self.max_limit // 4)
+        self.latency_tolerance = latency_tolerance
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+        self._ewma = None
+        self._baseline = None
+        self._successes = 0
+        self._last_decrease = 0.0
+
+    def _decrease(self, factor):
+        now = time.monotonic()
+        # One decrease per cooldown: the requests already in flight were sent at the old limit
+        if now - self._last_decrease < self.cooldown:
+            return
+        self._last_decrease = now
+        self.limit = max(self.min_limit, int(self.limit * factor))
+        self._successes = 0
+
+    def record(self, latency=None, throttled=False, failed=False):
+        with self._lock:
+            if throttled or failed:
+                self._decrease(0.5)
+                return
+            if latency is None:
+                return
+            self._ewma = latency if self._ewma is None else 0.8 * self._ewma + 0.2 * latency
+            # Baseline follows the best smoothed latency, drifting up slowly so one lucky sample does not pin it
+            self._baseline = self._ewma if self._baseline is None else min(self._ewma, self._baseline * 1.001)
+            if self._ewma > self._baseline * self.latency_tolerance:
+                self._decrease(0.9)
+                return
+            self._successes += 1
+            # Roughly one step per round of `limit` healthy responses
+            if self._successes >= self.limit and self.limit < self.max_limit:
+                self.limit += 1
+                self._successes = 0
+
+class HostLimits:
+    """Cap on requests in flight per host, shared by every run that is handed the same object.
+
+    Slots are shared fairly: while several runs want the same host, none of them
+    gets more than its even share, so one busy run cannot starve the others.
+    """
+    # A run that was refused a slot this recently still counts as waiting
+    WANT_TIMEOUT = 0.25
+
+    def __init__(self, per_host):
+        self.per_host = max(1, per_host)
+        self._cond = threading.Condition()
+        self._held = defaultdict(Counter)   # host -> owner -> slots held
+        self._wanting = defaultdict(dict)   # host -> owner -> when it was last refused
+
+    def _take(self, host, owner):
+        """Grant a slot if allowed, otherwise mark owner as waiting; caller holds the lock"""
+        held = self._held[host]
+        wanting = self._wanting[host]
+        now = time.monotonic()
+        for other, since in list(wanting.items()):
+            if now - since > self.WANT_TIMEOUT:
+                del wanting[other]
+        contenders = len(set(held) | set(wanting) | {owner})
+        share = -(-self.per_host // contenders)
+        others_waiting = any(other is not owner for other in wanting)
+        if sum(held.values()) >= self.per_host or (held[owner] >= share and others_waiting):
+            wanting[owner] = now
+            return False
+        held[owner] += 1
+        wanting.pop(owner, None)
+        return True
+
+    def try_acquire(self, host, owner=None):
+        with self._cond:
+            return self._take(host, owner)
+
+    def acquire(self, host, owner=None, timeout=None):
+        """Wait up to timeout seconds for a slot; returns False if none was granted"""
+        with self._cond:
+            return self._cond.wait_for(lambda: self._take(host, owner), timeout)
+
+    def release(self, host, owner=None):
+        with self._cond:
+            held = self._held[host]
+            held[owner] -= 1
+            if held[owner] <= 0:
+                del held[owner]
+            self._cond.notify_all()
+
+class RetryQueue:
+    """Failed attempts waiting to be sent again, each after its own exponential backoff.
+
+    budget caps how many retries one run may queue in total (None: no cap).
+    Thread-safe; workers push, whoever feeds the workers pops.
+    """
+    def __init__(self, budget=100, base_delay=0.5, max_delay=30.0):
+        self.budget = budget
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.used = 0
+        self._lock = threading.Lock()
+        self._heap = []
+        self._seq = itertools.count()
+
+    def backoff(self, tries):
+        """Delay before retry number tries + 1: doubling from base_delay, with jitter so retries do not bunch up"""
+        return min(self.max_delay, self.base_delay * 2 ** tries) * random.uniform(0.5, 1.0)
+
+    def push(self, item, tries, retry_after=None):
+        """Queue item for another try; False if the budget is used up"""
+        with self._lock:
+            if self.budget is not None and self.used >= self.budget:
+                return False
+            self.used += 1
+            due = time.monotonic() + max(self.backoff(tries), retry_after or 0)
+            heapq.heappush(self._heap, (due, next(self._seq), item))
+            return True
+
+    def pop_due(self):
+        """The oldest item whose backoff is over, or None"""
+        with self._lock:
+            if self._heap and self._heap[0][0] <= time.monotonic():
+                return heapq.heappop(self._heap)[2]
+            return None
+
+    def wait_time(self):
+        """Seconds until the next item is due (None if the queue is empty)"""
+        with self._lock:
+            if not self._heap:
+                return None
+            return max(0.0, self._heap[0][0] - time.monotonic())
+
+    def __len__(self):
+        with self._lock:
+            return len(self._heap)
+
+class CircuitBreaker:
+    """Opens after `threshold` consecutive errors, pausing the run.
+
+    After `cooldown` seconds one probe request is let through: an answer closes
+    the breaker, another error keeps it open for twice as long (up to max_cooldown).
+    """
+    def __init__(self, threshold=10, cooldown=5.0, max_cooldown=60.0):
+        self.threshold = max(1, threshold)
+        self.base_cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.cooldown = cooldown
+        self.open = False
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._retry_at = 0.0
+        self._probing = False
+
+    def wait_time(self):
+        """Seconds the caller should wait before sending; 0 when closed, or when the caller gets to send the probe"""
+        with self._lock:
+            if not self.open:
+                return 0.0
+            now = time.monotonic()
+            if now < self._retry_at:
+                return self._retry_at - now
+            if not self._probing:
+                self._probing = True
+                return 0.0
+            # A probe is out; check again shortly
+            return 0.1
+
+    def record(self, ok):
+        """Feed back one request; returns 'opened' or 'closed' when that changed the state, else None"""
+        with self._lock:
+            if ok:
+                self._failures = 0
+                if self.open:
+                    self.open = False
+                    self._probing = False
+                    self.cooldown = self.base_cooldown
+                    return 'closed'
+                return None
+            self._failures += 1
+            if self.open:
+                if self._probing:
+                    # The probe failed too: stay open, and wait longer next time
+                    self._probing = False
+                    self.cooldown = min(self.max_cooldown, self.cooldown * 2)
+                    self._retry_at = time.monotonic() + self.cooldown
+                return None
+            if self._failures >= self.threshold:
+                self.open = True
+                self._retry_at = time.monotonic() + self.cooldown
+                return 'opened'
+            return None
+
+class Scheduler:
+    """What every worker asks before sending, and tells after a response"""
+    def __init__(self, max_concurrency, rate=None, adaptive=False, stats=None, host=None, host_limits=None,
+                 breaker_threshold=None):
+        self.max_concurrency = max_concurrency
+        self.host = host
+        self.host_limits = host_limits
+        self.pacer = RatePacer(rate, burst=1) if rate else None
+        self.limiter = AdaptiveLimiter(max_concurrency) if adaptive else None
+        self.breaker = CircuitBreaker(breaker_threshold) if breaker_threshold else None
+        self.stats = stats
+        self.in_flight = 0
+        self._lock = threading.Lock()
+        self._publish()
+
+    @property
+    def limit(self):
+        """Current cap on in-flight requests"""
+        return self.limiter.limit if self.limiter else self.max_concurrency
+
+    def reserve(self):
+        """Seconds to wait before the next send (0 without a fixed rate)"""
+        return self.pacer.reserve() if self.pacer else 0.0
+
+    def blocked(self):
+        """Seconds to hold off while the circuit breaker is open (0 when sending is allowed)"""
+        return self.breaker.wait_time() if self.breaker else 0.0
+
+    def try_start(self):
+        """Take an in-flight slot (and a host slot) if one is free under the current limits"""
+        with self._lock:
+            if self.in_flight >= self.limit:
+                return False
+            if self.host_limits and not self.host_limits.try_acquire(self.host, self):
+                return False
+            self.in_flight += 1
+            return True
+
+    def finish(self):
+        with self._lock:
+            self.in_flight -= 1
+        self.release_host()
+
+    def acquire_host(self, stop_event):
+        """Block until the host has a free slot; False if stop_event was set first"""
+        if not self.host_limits:
+            return True
+        while not self.host_limits.acquire(self.host, self, timeout=0.1):
+            if stop_event.is_set():
+                return False
+        return True
+
+    def release_host(self):
+        if self.host_limits:
+            self.host_limits.release(self.host, self)
+
+    def record(self, status_code=None, latency=None, timeout=False, error=False, retry_after=None):
+        """Feed back the outcome of one attempt; returns the circuit breaker's state change, if any"""
+        throttled = status_code in THROTTLE_STATUS
+        if self.pacer and throttled and retry_after:
+            self.pacer.pause(retry_after)
+        if self.limiter:
+            self.limiter.record(latency, throttled=throttled or timeout, failed=error)
+            self._publish()
+        if self.breaker:
+            return self.breaker.record(not error and (status_code or 0) < 500)
+        return None
+
+    def _publish(self):
+        # Only an adaptive limit is worth reporting; a fixed one is just --threads
+        if self.limiter and self.stats is not None:
+            self.stats.concurrency = self.limit
+
+def parse_retry_after(value):
+    """Seconds from a Retry-After header (delta-seconds form only), or None"""
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
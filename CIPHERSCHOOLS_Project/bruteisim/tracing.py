@@ -0,0 +1,189 @@
+"""
+Request Tracing for Brute Force Testing
+Times the phases of a sample of attempts (executor queue, scheduling, connect,
+request until the response head, body download, classification, reporting)
+and saves them in the Chrome trace-event format, for chrome://tracing or
+https://ui.perfetto.dev. Attempts that are not sampled cost one counter step.
+"""
+
+import functools
+import itertools
+import json
+import os
+import threading
+from time import perf_counter
+
+# httpcore trace events timed on the http2 engine -> span name
+HTTPX_PHASES = {'connection.connect_tcp': 'connect', 'connection.start_tls': 'tls',
+                'http2.send_connection_init': 'h2 init'}
+
+# Cap on recorded events, so a long run cannot grow the trace without bound
+MAX_EVENTS = 200000
+
+_local = threading.local()
+
+def current_trace():
+    """The AttemptTrace of the attempt running on this thread, if it is sampled"""
+    return getattr(_local, 'trace', None)
+
+def activate(trace):
+    _local.trace = trace
+
+def micros(seconds):
+    return round(seconds * 1e6, 1)
+
+class AttemptTrace:
+    """Spans of one sampled attempt; every span of an attempt is on the same track (tid)"""
+    __slots__ = ('pid', 'tid', 'start', 'events', 'args')
+
+    def __init__(self, pid, tid):
+        self.pid = pid
+        self.tid = tid
+        self.start = perf_counter()
+        self.events = []
+        self.args = {}
+
+    def add(self, name, start, end=None, **args):
+        """Record phase `name` from start to end (default: now), both perf_counter() values"""
+        end = perf_counter() if end is None else end
+        event = {'name': name, 'ph': 'X', 'ts': micros(start), 'dur': micros(end - start), 'pid': self.pid, 'tid': self.tid}
+        if args:
+            event['args'] = args
+        self.events.append(event)
+
+    def add_queued(self, queued, index):
+        """Record the wait in the executor queue, which overlaps whatever this thread was running meanwhile"""
+        # An async (b/e) pair gets its own row, so overlapping waits do not break the thread's nesting
+        event = {'name': 'queued', 'cat': 'queue', 'id': index if index is not None else id(self), 'pid': self.pid,
+                 'tid': self.tid}
+        self.events.append(dict(event, ph='b', ts=micros(queued)))
+        self.events.append(dict(event, ph='e', ts=micros(self.start)))
+
+class Tracer:
+    """Collects the spans of every `1 / sample`-th attempt of a run.
+
+    Thread-safe; save() writes one trace file. Shard processes each have their
+    own Tracer and send events() to the parent, which extend()s its own.
+    """
+    def __init__(self, sample=0.01, max_events=MAX_EVENTS, process_name=None):
+        if not 0 < sample <= 1:
+            raise ValueError("sample must be in (0, 1]")
+        self.sample = sample
+        self.every = max(1, round(1 / sample))
+        self.max_events = max_events
+        self.pid = os.getpid()
+        self.attempts = 0
+        self.dropped = 0
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+        self._events = []
+        self._metadata = {}
+        if process_name:
+            self._metadata[(self.pid, None)] = process_name
+
+    def start_attempt(self, tid=None, track_name=None):
+        """An AttemptTrace if this attempt is sampled, else None; tid defaults to the calling thread"""
+        if next(self._counter) % self.every:
+            return None
+        if tid is None:
+            tid = threading.get_ident()
+            track_name = threading.current_thread().name
+        if (self.pid, tid) not in self._metadata and track_name:
+            self._metadata[(self.pid, tid)] = track_name
+        return AttemptTrace(self.pid, tid)
+
+    def finish(self, trace, **args):
+        """Close the attempt's overall span and keep its events"""
+        trace.args.update(args)
+        trace.add('attempt', trace.start, **trace.args)
+        self.extend(trace.events, attempts=1)
+
+    def extend(self, events, attempts=None):
+        with self._lock:
+            room = self.max_events - len(self._events)
+            if room < len(events):
+                self.dropped += len(events) - max(0, room)
+                events = events[:max(0, room)]
+            self._events.extend(events)
+            self.attempts += attempts if attempts is not None else sum(1 for e in events if e['name'] == 'attempt')
+
+    def events(self):
+        """Recorded events plus track names, e.g. to hand to another process's Tracer"""
+        with self._lock:
+            events = list(self._events)
+            metadata = dict(self._metadata)
+        for (pid, tid), name in metadata.items():
+            if tid is None:
+                events.append({'name': 'process_name', 'ph': 'M', 'pid': pid, 'args': {'name': name}})
+            else:
+                events.append({'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': name}})
+        return events
+
+    def save(self, path):
+        """Atomically write the trace file; returns the number of events written"""
+        events = self.events()
+        trace = {'traceEvents': events, 'displayTimeUnit': 'ms',
+                 'otherData': {'sample': self.sample, 'attempts': self.attempts, 'dropped_events': self.dropped}}
+        tmp = f"{path}.tmp"
+        with open(tmp, 'w') as f:
+            json.dump(trace, f)
+        os.replace(tmp, path)
+        return len(events)
+
+@functools.lru_cache(maxsize=None)
+def timed_connection(connection_cls):
+    """Subclass of a urllib3 connection class that records 'connect' (DNS + TCP + TLS) for sampled attempts"""
+    class TimedConnection(connection_cls):
+        def connect(self):
+            trace = current_trace()
+            if trace is None:
+                return super().connect()
+            start = perf_counter()
+            try:
+                return super().connect()
+            finally:
+                trace.add('connect', start, host=self.host)
+
+    TimedConnection.__name__ = f"Timed{connection_cls.__name__}"
+    return TimedConnection
+
+def aiohttp_trace_config():
+    """aiohttp TraceConfig recording pool wait, DNS and connect for requests sent with trace_request_ctx=AttemptTrace"""
+    import aiohttp
+
+    def phase(name):
+        async def on_start(session, ctx, params):
+            ctx.started = getattr(ctx, 'started', {})
+            ctx.started[name] = perf_counter()
+
+        async def on_end(session, ctx, params):
+            trace = ctx.trace_request_ctx
+            started = getattr(ctx, 'started', {}).get(name)
+            if isinstance(trace, AttemptTrace) and started is not None:
+                trace.add(name, started)
+        return on_start, on_end
+
+    config = aiohttp.TraceConfig()
+    for name, start_signal, end_signal in (
+        ('pool wait', config.on_connection_queued_start, config.on_connection_queued_end),
+        ('dns', config.on_dns_resolvehost_start, config.on_dns_resolvehost_end),
+        ('connect', config.on_connection_create_start, config.on_connection_create_end),
+    ):
+        on_start, on_end = phase(name)
+        start_signal.append(on_start)
+        end_signal.append(on_end)
+    return config
+
+def httpx_trace_hook(trace):
+    """httpx 'trace' request extension recording connect, TLS and HTTP/2 setup for one sampled attempt"""
+    started = {}
+
+    async def hook(event, info):
+        name, _, stage = event.rpartition('.')
+        if name not in HTTPX_PHASES:
+            return
+        if stage == 'started':
+            started[name] = perf_counter()
+        elif name in started:
+            trace.add(HTTPX_PHASES[name], started.pop(name))
+    return hook
@@ -0,0 +1,150 @@
+"""
+Compiled Wordlists for Brute Force Testing
+A compiled wordlist is the deduplicated entries of a text wordlist, in their
+original order, behind an offset index. It is read through mmap, so its length
+is known without reading it and entry N is one seek away, which lets shards
+start at their own entries instead of skipping through everyone else's.
+
+Layout (little-endian): magic, entry count, count + 1 data offsets (uint64),
+then the UTF-8 entries back to back.
+"""
+
+import argparse
+import mmap
+import os
+import shutil
+import struct
+import sys
+import tempfile
+from array import array
+
+MAGIC = b'BRUTEWL1'
+HEADER = struct.Struct('<8sQ')
+OFFSET = struct.Struct('<Q')
+OFFSET_PAIR = struct.Struct('<2Q')
+COMPILED_SUFFIX = '.bwl'
+
+def is_compiled_wordlist(path):
+    """True if path is a compiled wordlist (checked by its magic, not its name)"""
+    try:
+        with open(path, 'rb') as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+def iter_entries(lines):
+    """Stripped, non-empty lines, the same entries the engine would try from a text wordlist"""
+    for line in lines:
+        entry = line.strip()
+        if entry:
+            yield entry
+
+def compile_wordlist(entries, output, limit=None):
+    """Write the unique entries of an iterable of lines to output; returns (written, duplicates)"""
+    seen = set()
+    offsets = array('Q', [0])
+    duplicates = 0
+    directory = os.path.dirname(os.path.abspath(output))
+    with tempfile.TemporaryFile(dir=directory) as data:
+        for entry in iter_entries(entries):
+            if limit is not None and len(seen) >= limit:
+                break
+            if entry in seen:
+                duplicates += 1
+                continue
+            seen.add(entry)
+            encoded = entry.encode('utf-8', errors='replace')
+            data.write(encoded)
+            offsets.append(offsets[-1] + len(encoded))
+        count = len(offsets) - 1
+        if sys.byteorder != 'little':
+            offsets.byteswap()
+        data.seek(0)
+        tmp = output + '.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, count))
+            offsets.tofile(f)
+            shutil.copyfileobj(data, f, 1024 * 1024)
+        os.replace(tmp, output)
+    return count, duplicates
+
+class CompiledWordlist:
+    """Read-only, random-access view of a compiled wordlist"""
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb')
+        self._map = None
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, self.count = HEADER.unpack_from(self._map, 0)
+        except (ValueError, struct.error):
+            magic = None
+        if magic != MAGIC:
+            if self._map is not None:
+                self._map.close()
+            self._file.close()
+            raise ValueError(f"{path} is not a compiled wordlist")
+        self._index = HEADER.size
+        self._data = HEADER.size + (self.count + 1) * OFFSET.size
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, n):
+        if n < 0:
+            n += self.count
+        if not 0 <= n < self.count:
+            raise IndexError('wordlist index out of range')
+        start, end = OFFSET_PAIR.unpack_from(self._map, self._index + n * OFFSET.size)
+        return self._map[self._data + start:self._data + end].decode('utf-8', errors='replace')
+
+    def iter(self, start=0, step=1, limit=None):
+        """Entries start, start + step, ... among the first `limit` entries"""
+        stop = self.count if limit is None else min(limit, self.count)
+        for n in range(start, stop, step):
+            yield self[n]
+
+    def __iter__(self):
+        return self.iter()
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile text wordlists into deduplicated, indexed binary wordlists")
+    commands = parser.add_subparsers(dest='command', required=True)
+    compile_cmd = commands.add_parser('compile-wordlist', help='Compile a text wordlist (or "builtin")')
+    compile_cmd.add_argument('source', help="Text wordlist, or 'builtin' for the built-in passwords")
+    compile_cmd.add_argument('output', nargs='?', help=f'Output file (default: source with a {COMPILED_SUFFIX} suffix)')
+    compile_cmd.add_argument('--limit', type=int, help='Only keep the first N unique entries', default=None)
+    info_cmd = commands.add_parser('info', help='Show the entry count of a compiled wordlist')
+    info_cmd.add_argument('path')
+    args = parser.parse_args()
+
+    if args.command == 'info':
+        with CompiledWordlist(args.path) as words:
+            print(f"[+] {args.path}: {len(words)} entries")
+            if len(words):
+                print(f"[+] First: {words[0]!r}, last: {words[-1]!r}")
+        return
+
+    if args.source == 'builtin':
+        from bruteisim import get_builtin_passwords
+        entries = get_builtin_passwords()
+        output = args.output or 'builtin' + COMPILED_SUFFIX
+        count, duplicates = compile_wordlist(entries, output, args.limit)
+    else:
+        output = args.output or os.path.splitext(args.source)[0] + COMPILED_SUFFIX
+        with open(args.source, 'r', errors='replace') as f:
+            count, duplicates = compile_wordlist(f, output, args.limit)
+    print(f"[+] Compiled {count} unique entries to {output} ({duplicates} duplicates dropped)")
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,5 @@
 // List of targets (can be extended)
-const targets = [
+let targets = [
   {
     name: "Acunetix PHP (testphp.vulnweb.com)",
     url: "http://testphp.vulnweb.com/userinfo.php",
@@ -31,6 +31,7 @@ const targets = [
 
 function populateTargets() {
   const select = document.getElementById('target');
+  select.innerHTML = '';
   targets.forEach((t, i) => {
     const opt = document.createElement('option');
     opt.value = i;
@@ -56,6 +57,9 @@ document.addEventListener('DOMContentLoaded', () => {
     fillFormFromTarget(e.target.value);
   });
   document.getElementById('downloadBtn').addEventListener('click', downloadConfig);
+  if (location.protocol.startsWith('http')) {
+    initDashboard();
+  }
 });
 
 function downloadConfig() {
@@ -90,4 +94,197 @@ function toYAML(obj) {
     out += `${k}: "${String(obj[k]).replace(/"/g, '\"')}"\n`;
   }
   return out;
-} 
\ No newline at end of file
+} 
+
+// --- Live dashboard (only when served by run_bruteforce.py --dashboard) ---
+
+const runs = {};
+
+async function initDashboard() {
+  let response;
+  try {
+    response = await fetch('/api/targets');
+  } catch (e) {
+    return;
+  }
+  if (!response.ok) {
+    return;
+  }
+  const data = await response.json();
+  targets = data.targets;
+  populateTargets();
+  const select = document.getElementById('runTarget');
+  targets.forEach(t => {
+    const opt = document.createElement('option');
+    opt.value = t.name;
+    opt.textContent = `${t.name} (${t.url})`;
+    select.appendChild(opt);
+  });
+  document.getElementById('dashboard').hidden = false;
+  document.getElementById('startBtn').addEventListener('click', () => control('start'));
+  document.getElementById('stopBtn').addEventListener('click', () => control('stop'));
+  document.getElementById('chartRun').addEventListener('change', drawCharts);
+
+  const events = new EventSource('/events');
+  // The first event carries every run's history, later ones only the newest sample
+  events.addEventListener('snapshot', e => {
+    JSON.parse(e.data).runs.forEach(run => {
+      runs[run.name] = run;
+    });
+    render();
+  });
+  events.addEventListener('stats', e => {
+    JSON.parse(e.data).runs.forEach(run => {
+      const known = runs[run.name];
+      const restarted = !known || known.started !== run.started;
+      run.history = restarted ? [] : known.history;
+      const last = run.history[run.history.length - 1];
+      if (run.point && (!last || last.t !== run.point.t)) {
+        run.history.push(run.point);
+      }
+      runs[run.name] = run;
+    });
+    render();
+  });
+}
+
+async function control(action) {
+  const body = {target: document.getElementById('runTarget').value};
+  if (action === 'start') {
+    body.wordlist = document.getElementById('runWordlist').value;
+    body.limit = document.getElementById('runLimit').value;
+  }
+  const response = await fetch(`/api/${action}`, {
+    method: 'POST',
+    headers: {'Content-Type': 'application/json'},
+    body: JSON.stringify(body)
+  });
+  const data = await response.json();
+  document.getElementById('runError').textContent = response.ok ? '' : data.error;
+  if (response.ok && action === 'start') {
+    document.getElementById('chartRun').dataset.pick = body.target;
+  }
+}
+
+function ms(seconds) {
+  return seconds == null ? '-' : (seconds * 1000).toFixed(0);
+}
+
+// Table row of text cells; values are set as textContent, never parsed as HTML
+function tableRow(tag, cells) {
+  const tr = document.createElement('tr');
+  cells.forEach(cell => {
+    const td = document.createElement(tag);
+    const [text, className] = Array.isArray(cell) ? cell : [cell];
+    td.textContent = text;
+    if (className) {
+      td.className = className;
+    }
+    tr.appendChild(td);
+  });
+  return tr;
+}
+
+function render() {
+  const table = document.createElement('table');
+  table.appendChild(tableRow('th', ['target', 'state', 'attempts', 'att/s', 'p50 ms', 'p90 ms', 'p99 ms', 'errors',
+    'retries', 'conc.', 'verdicts']));
+  Object.values(runs).forEach(run => {
+    const s = run.stats;
+    const errors = Object.values(s.errors).reduce((a, b) => a + b, 0);
+    const verdicts = Object.entries(s.verdicts).map(([k, v]) => `${k} ${v}`).join(', ');
+    const progress = s.total ? `${s.attempts}/${s.total}` : s.attempts;
+    const concurrency = run.point ? run.point.concurrency : '-';
+    table.appendChild(tableRow('td', [run.name, [run.result || run.state, 'state'], progress,
+      s.current_attempts_per_sec, ms(s.latency_p50), ms(s.latency_p90), ms(s.latency_p99), errors, s.retries,
+      concurrency, [verdicts, 'state']]));
+  });
+  const container = document.getElementById('runs');
+  container.replaceChildren(...(table.rows.length > 1 ? [table] : []));
+
+  const chartRun = document.getElementById('chartRun');
+  const names = Object.keys(runs);
+  if (chartRun.options.length !== names.length) {
+    const current = chartRun.value;
+    chartRun.replaceChildren(...names.map(n => {
+      const opt = document.createElement('option');
+      opt.value = n;
+      opt.textContent = n;
+      return opt;
+    }));
+    chartRun.value = current || names[0];
+  }
+  if (chartRun.dataset.pick && runs[chartRun.dataset.pick]) {
+    chartRun.value = chartRun.dataset.pick;
+    delete chartRun.dataset.pick;
+  }
+  drawCharts();
+}
+
+function drawCharts() {
+  const run = runs[document.getElementById('chartRun').value];
+  const history = run ? run.history : [];
+  drawChart('rateChart', 'attempts/sec and concurrency', history, [
+    {key: 'rate', color: '#1976d2'},
+    {key: 'concurrency', color: '#90a4ae'}
+  ]);
+  drawChart('latencyChart', 'latency ms (p50 / p90 / p99)', history, [
+    {key: 'p50', color: '#2e7d32', scale: 1000},
+    {key: 'p90', color: '#f9a825', scale: 1000},
+    {key: 'p99', color: '#c62828', scale: 1000}
+  ]);
+  drawChart('errorChart', 'error rate %', history, [
+    {key: 'error_rate', color: '#c62828', scale: 100}
+  ]);
+}
+
+// Line chart of the given keys over the run's elapsed time, all on one y axis starting at 0
+function drawChart(id, title, history, series) {
+  const canvas = document.getElementById(id);
+  const ctx = canvas.getContext('2d');
+  const pad = 30;
+  const w = canvas.width - pad * 2;
+  const h = canvas.height - pad * 2;
+  ctx.clearRect(0, 0, canvas.width, canvas.height);
+  ctx.font = '12px sans-serif';
+  ctx.fillStyle = '#2a3b4c';
+  ctx.fillText(title, pad, 16);
+  if (history.length < 2) {
+    return;
+  }
+  const value = (point, s) => point[s.key] == null ? null : point[s.key] * (s.scale || 1);
+  let max = 0;
+  history.forEach(p => series.forEach(s => { max = Math.max(max, value(p, s) || 0); }));
+  max = max || 1;
+  const t0 = history[0].t;
+  const span = (history[history.length - 1].t - t0) || 1;
+  ctx.fillText(max.toFixed(max < 10 ? 1 : 0), 2, pad + 4);
+  ctx.fillText(`${span.toFixed(0)}s`, canvas.width - pad, canvas.height - 8);
+  ctx.strokeStyle = '#e0e6ea';
+  ctx.beginPath();
+  ctx.moveTo(pad, pad);
+  ctx.lineTo(pad, pad + h);
+  ctx.lineTo(pad + w, pad + h);
+  ctx.stroke();
+  series.forEach(s => {
+    ctx.strokeStyle = s.color;
+    ctx.beginPath();
+    let drawing = false;
+    history.forEach(p => {
+      const v = value(p, s);
+      if (v == null) {
+        drawing = false;
+        return;
+      }
+      const x = pad + (p.t - t0) / span * w;
+      const y = pad + h - v / max * h;
+      if (drawing) {
+        ctx.lineTo(x, y);
+      } else {
+        ctx.moveTo(x, y);
+        drawing = true;
+      }
+    });
+    ctx.stroke();
+  });
+}